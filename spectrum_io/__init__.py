@@ -17,13 +17,17 @@ except Exception:
 import logging
 import logging.handlers
 import sys
+from typing import TYPE_CHECKING
 
-from spectrum_io import d, file, raw
+from ._lazy import attach
 
-# from .search_result import MaxQuant
-# from .spectral_library import DLib, Spectronaut
+if TYPE_CHECKING:
+    from spectrum_io import d, file, raw, search_result, spectral_library
 
-__all__ = ["__version__", "d", "file", "raw"]
+# subpackages are imported on first access, so that e.g. writing a spectral library does not import alphatims
+__getattr__, __dir__ = attach(__name__, submodules=["d", "file", "raw", "search_result", "spectral_library"])
+
+__all__ = ["__version__", "d", "file", "raw", "search_result", "spectral_library"]
 
 CONSOLE_LOG_LEVEL = logging.INFO
 logger = logging.getLogger(__name__)
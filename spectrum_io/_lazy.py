@@ -0,0 +1,40 @@
+"""Deferred imports of subpackages and their heavy dependencies."""
+
+import importlib
+from collections.abc import Callable
+from typing import Any
+
+
+def attach(
+    package: str, submodules: list[str] | None = None, attributes: dict[str, str] | None = None
+) -> tuple[Callable[[str], Any], Callable[[], list[str]]]:
+    """
+    Create a module level __getattr__ that imports submodules and their members on first access.
+
+    Importing a package using this only executes its __init__, while submodules, and with them heavy dependencies
+    like alphatims, h5py or pyopenms, are imported once one of their attributes is accessed. Afterwards, the attribute
+    is cached in the package namespace, so subsequent accesses do not go through __getattr__ anymore.
+
+    :param package: the name of the package, i.e. __name__ of the calling __init__
+    :param submodules: names of submodules exposed as attributes of the package
+    :param attributes: mapping of exposed attribute names to the name of the submodule defining them
+    :return: a tuple of the __getattr__ and __dir__ functions of the package
+    """
+    submodules = submodules or []
+    attributes = attributes or {}
+    names = sorted(set(submodules) | set(attributes))
+
+    def __getattr__(name: str) -> Any:
+        if name in submodules:
+            value = importlib.import_module(f"{package}.{name}")
+        elif name in attributes:
+            value = getattr(importlib.import_module(f"{package}.{attributes[name]}"), name)
+        else:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        setattr(importlib.import_module(package), name, value)
+        return value
+
+    def __dir__() -> list[str]:
+        return sorted(set(vars(importlib.import_module(package))) | set(names))
+
+    return __getattr__, __dir__
@@ -0,0 +1,173 @@
+"""Process wide resource limits of spectrum_io."""
+
+import os
+import re
+import tempfile
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+ENV_PREFIX = "SPECTRUM_IO_"
+DEFAULT_MAX_BATCH_BYTES = 256 * 1024**2
+
+_UNITS = {"": 1, "k": 1024, "m": 1024**2, "g": 1024**3, "t": 1024**4}
+
+
+def _available_cpus() -> int:
+    if hasattr(os, "sched_getaffinity"):
+        # respects CPU pinning by e.g. taskset or a batch scheduler, unlike os.cpu_count
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def parse_bytes(value: str | int) -> int:
+    """
+    Parse a number of bytes, optionally given with a binary unit, e.g. "512M", "2GiB" or "1024".
+
+    :param value: the number of bytes as integer or string
+    :raises ValueError: if the value cannot be parsed
+    :return: the number of bytes
+    """
+    if isinstance(value, int):
+        return value
+    match = re.fullmatch(r"\s*(\d+)\s*([kmgt]?)(?:i?b)?\s*", value.lower())
+    if match is None:
+        raise ValueError(f"Cannot parse {value!r} as a number of bytes, use e.g. '512M' or '2G'.")
+    return int(match.group(1)) * _UNITS[match.group(2)]
+
+
+class Config:
+    """
+    Resource limits honored by all parallel and streaming operations.
+
+    Each setting can be provided by an environment variable with the prefix SPECTRUM_IO_, which is read once at
+    import, e.g. SPECTRUM_IO_MAX_WORKERS=4, SPECTRUM_IO_MAX_BATCH_BYTES=1G or SPECTRUM_IO_TEMP_DIR=/scratch, and
+    changed at runtime using :func:`set_config` or :func:`config_context`.
+    """
+
+    SETTINGS = ["max_workers", "max_batch_bytes", "temp_dir"]
+
+    def __init__(
+        self,
+        max_workers: int | None = None,
+        max_batch_bytes: int | str = DEFAULT_MAX_BATCH_BYTES,
+        temp_dir: str | Path | None = None,
+    ):
+        """
+        Initialize a Config.
+
+        :param max_workers: maximum number of worker processes of parallel operations. If None, all CPUs available
+            to the process are used.
+        :param max_batch_bytes: maximum number of bytes of batches that are held in memory at the same time, either
+            as integer or with a binary unit, e.g. "512M". Streaming readers derive their batch sizes from it and
+            parallel operations limit the number of batches in flight.
+        :param temp_dir: directory for temporary files and caches. If None, the platform default is used.
+        :raises ValueError: if max_workers or max_batch_bytes is smaller than 1
+        """
+        self.max_workers = max_workers
+        self.max_batch_bytes = parse_bytes(max_batch_bytes)
+        self.temp_dir = Path(temp_dir) if temp_dir is not None else None
+        if self.max_workers is not None and self.max_workers < 1:
+            raise ValueError(f"max_workers must be at least 1, got {self.max_workers}.")
+        if self.max_batch_bytes < 1:
+            raise ValueError(f"max_batch_bytes must be at least 1, got {self.max_batch_bytes}.")
+
+    def __repr__(self) -> str:
+        """Show all settings."""
+        return f"Config({', '.join(f'{name}={getattr(self, name)!r}' for name in self.SETTINGS)})"
+
+    @classmethod
+    def from_env(cls) -> "Config":
+        """
+        Create a configuration from the SPECTRUM_IO_ environment variables, using the defaults for unset variables.
+
+        :return: the configuration
+        """
+        env = {name: os.environ.get(f"{ENV_PREFIX}{name.upper()}") for name in cls.SETTINGS}
+        return cls(
+            max_workers=int(env["max_workers"]) if env["max_workers"] else None,
+            max_batch_bytes=env["max_batch_bytes"] or DEFAULT_MAX_BATCH_BYTES,
+            temp_dir=env["temp_dir"] or None,
+        )
+
+    def replace(self, **changes) -> "Config":
+        """
+        Create a copy of this configuration with some settings changed.
+
+        :param changes: the settings to change
+        :raises TypeError: if an unknown setting is given
+        :return: the new configuration
+        """
+        unknown = set(changes) - set(self.SETTINGS)
+        if unknown:
+            raise TypeError(f"Unknown settings {sorted(unknown)}. Choose from {self.SETTINGS}.")
+        return Config(**{name: changes.get(name, getattr(self, name)) for name in self.SETTINGS})
+
+    @property
+    def workers(self) -> int:
+        """The number of worker processes to use, resolving max_workers=None to the number of available CPUs."""
+        return self.max_workers or _available_cpus()
+
+    def batch_rows(self, bytes_per_row: float, in_flight: int = 1) -> int:
+        """
+        Get the number of rows per batch, such that in_flight batches stay within max_batch_bytes.
+
+        :param bytes_per_row: the (estimated) size of a row in memory
+        :param in_flight: number of batches that are held in memory at the same time
+        :return: the number of rows per batch, at least 1
+        """
+        return max(1, int(self.max_batch_bytes // (max(bytes_per_row, 1) * max(in_flight, 1))))
+
+    def get_temp_dir(self) -> Path:
+        """
+        Get the directory for temporary files, creating it if necessary.
+
+        :return: the configured temp_dir or the platform's default temporary directory
+        """
+        if self.temp_dir is None:
+            return Path(tempfile.gettempdir())
+        self.temp_dir.mkdir(parents=True, exist_ok=True)
+        return self.temp_dir
+
+
+_config = Config.from_env()
+
+
+def get_config() -> Config:
+    """
+    Get the current configuration.
+
+    :return: the configuration
+    """
+    return _config
+
+
+def set_config(**changes) -> Config:
+    """
+    Change settings of the configuration, e.g. set_config(max_workers=4, max_batch_bytes="2G").
+
+    Changing max_workers restarts the shared worker pool with the new size on its next use.
+
+    :param changes: the settings to change, see :class:`Config`
+    :return: the previous configuration
+    """
+    global _config
+    previous = _config
+    _config = _config.replace(**changes)
+    return previous
+
+
+@contextmanager
+def config_context(**changes) -> Iterator[Config]:
+    """
+    Temporarily change settings of the configuration, see :func:`set_config`.
+
+    :param changes: the settings to change
+    :yield: the configuration within the context
+    """
+    global _config
+    previous = set_config(**changes)
+    try:
+        yield _config
+    finally:
+        _config = previous
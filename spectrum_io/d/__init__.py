@@ -1,9 +1,39 @@
 """Init raw."""
 
 import logging
+from typing import TYPE_CHECKING
 
-from .bruker import convert_d_hdf, read_and_aggregate_timstof
+from .._lazy import attach
 
-__all__ = ["convert_d_hdf", "read_and_aggregate_timstof"]
+if TYPE_CHECKING:
+    from .bruker import (
+        cache_timstof_hdf,
+        convert_d_hdf,
+        iter_timstof,
+        read_and_aggregate_timstof,
+        read_and_aggregate_timstof_runs,
+    )
+
+__getattr__, __dir__ = attach(
+    __name__,
+    attributes={
+        name: "bruker"
+        for name in [
+            "cache_timstof_hdf",
+            "convert_d_hdf",
+            "iter_timstof",
+            "read_and_aggregate_timstof",
+            "read_and_aggregate_timstof_runs",
+        ]
+    },
+)
+
+__all__ = [
+    "cache_timstof_hdf",
+    "convert_d_hdf",
+    "iter_timstof",
+    "read_and_aggregate_timstof",
+    "read_and_aggregate_timstof_runs",
+]
 
 logger = logging.getLogger(__name__)
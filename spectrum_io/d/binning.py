@@ -0,0 +1,115 @@
+import numpy as np
+
+DEFAULT_PPM = 40
+BINNING_METHODS = ["masterspectrum", "vectorized"]
+
+
+def _cluster_starts(mzs: np.ndarray, segment_starts: np.ndarray, ppm: float) -> np.ndarray:
+    """
+    Find the start of each cluster of mz values sorted within segments.
+
+    A new cluster starts at the beginning of each segment and wherever the gap to the previous mz reaches the mass
+    tolerance of the previous mz, which is the condition under which a MasterPeak does not absorb a peak.
+
+    :param mzs: mz values, sorted within each segment
+    :param segment_starts: boolean mask of the mz values starting a new segment
+    :param ppm: mass tolerance in ppm
+    :return: the indices of the first mz of each cluster
+    """
+    is_start = segment_starts.copy()
+    is_start[1:] |= np.diff(mzs) >= mzs[:-1] * (ppm * 1e-6)
+    return np.flatnonzero(is_start)
+
+
+def bin_spectra(
+    mzs: np.ndarray,
+    intensities: np.ndarray,
+    offsets: np.ndarray,
+    ppm: float = DEFAULT_PPM,
+    charges: np.ndarray | None = None,
+) -> tuple[np.ndarray, ...]:
+    """
+    Bin a batch of spectra in one vectorized pass, see :func:`bin_peaks` for the binning of a single spectrum.
+
+    The spectra are given in CSR-style, i.e. as flat arrays of the peaks of all spectra, where the peaks of spectrum
+    i are found at offsets[i]:offsets[i + 1]. All peaks are sorted by spectrum and mz at once and clusters are
+    detected within each spectrum, so there is no per-spectrum Python overhead.
+    If the charges of the peaks are given, peaks of different charge are never merged. Each spectrum is then
+    partitioned by charge within the same pass, and its binned peaks are sorted by charge and mz.
+
+    :param mzs: flat array of mz values of the peaks of all spectra
+    :param intensities: flat array of intensities of the peaks of all spectra
+    :param offsets: array of length n_spectra + 1 with the start of each spectrum in the flat arrays
+    :param ppm: mass tolerance in ppm
+    :param charges: optional flat array of the charges of the peaks of all spectra
+    :return: a tuple of the binned mz values, sorted within each spectrum, the relative intensities and the offsets
+        of the binned spectra, followed by the charges of the binned peaks if charges are given
+    """
+    mzs = np.asarray(mzs, dtype=np.float64)
+    intensities = np.asarray(intensities, dtype=np.float64)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    lengths = np.diff(offsets)
+    if mzs.size == 0:
+        empty = (mzs, intensities, np.zeros_like(offsets))
+        return empty if charges is None else (*empty, np.asarray(charges, dtype=np.int64))
+    spectrum_ids = np.repeat(np.arange(lengths.size), lengths)
+    non_empty = lengths > 0
+    max_intensities = np.maximum.reduceat(intensities, offsets[:-1][non_empty])
+    rel_intensities = intensities / np.repeat(max_intensities, lengths[non_empty])
+
+    # segments are spectra, or the charge partitions of spectra if charges are given
+    if charges is None:
+        segment_ids = spectrum_ids
+    else:
+        charge_values, charge_codes = np.unique(np.asarray(charges, dtype=np.int64), return_inverse=True)
+        segment_ids = spectrum_ids * np.int64(charge_values.size) + charge_codes
+    # sort by (segment, mz) using a single int64 key combining the segment id and the global rank of the mz,
+    # which yields the same order as np.lexsort((mzs, segment_ids)) in about half the time
+    mz_ranks = np.empty(mzs.size, dtype=np.int64)
+    mz_ranks[np.argsort(mzs)] = np.arange(mzs.size)
+    order = np.argsort(segment_ids * np.int64(mzs.size) + mz_ranks)
+    sorted_mzs = mzs[order]
+    rel_intensities = rel_intensities[order]
+    sorted_segment_ids = segment_ids[order]
+    segment_starts = np.empty(mzs.size, dtype=bool)
+    segment_starts[0] = True
+    segment_starts[1:] = sorted_segment_ids[1:] != sorted_segment_ids[:-1]
+    starts = _cluster_starts(sorted_mzs, segment_starts, ppm)
+
+    summed_intensities = np.add.reduceat(rel_intensities, starts)
+    weighted_mzs = np.add.reduceat(sorted_mzs * rel_intensities, starts)
+    counts = np.diff(np.append(starts, mzs.size))
+    mean_mzs = np.add.reduceat(sorted_mzs, starts) / counts
+    # clusters of zero intensity peaks have no weights, so their plain mean is used
+    binned_mzs = np.divide(weighted_mzs, summed_intensities, out=mean_mzs, where=summed_intensities > 0)
+    clusters_per_spectrum = np.bincount(spectrum_ids[order][starts], minlength=lengths.size)
+    binned_offsets = np.concatenate(([0], np.cumsum(clusters_per_spectrum)))
+    if charges is None:
+        return binned_mzs, summed_intensities, binned_offsets
+    return binned_mzs, summed_intensities, binned_offsets, charge_values[charge_codes[order][starts]]
+
+
+def bin_peaks(
+    mzs: np.ndarray, intensities: np.ndarray, ppm: float = DEFAULT_PPM, charges: np.ndarray | None = None
+) -> tuple[np.ndarray, ...]:
+    """
+    Sum the peaks of several spectra into one, merging peaks whose mz are within the given tolerance.
+
+    This is a vectorized equivalent of summing the peaks using :class:`MasterSpectrum`. All peaks are sorted by mz
+    once and split into clusters wherever two consecutive mz are further apart than the tolerance. Intensities are
+    scaled relative to the most intense peak, and each cluster results in one peak with the intensity-weighted mean
+    mz and the summed relative intensity of its peaks.
+    Since clusters are formed by consecutive gaps, a dense series of peaks spanning more than the tolerance ends up
+    in one cluster, where MasterSpectrum may split it depending on the order of insertion. For peaks of the same
+    fragment observed across scans both lead to the same result.
+
+    :param mzs: mz values of the peaks of all spectra to sum
+    :param intensities: intensities of the peaks of all spectra to sum
+    :param ppm: mass tolerance in ppm
+    :param charges: optional charges of the peaks. If given, only peaks of the same charge are merged.
+    :return: a tuple of the mz values, in ascending order, and the relative intensities of the summed spectrum,
+        followed by the charges of the summed peaks if charges are given, in which case peaks are sorted by charge
+        and mz
+    """
+    binned = bin_spectra(mzs, intensities, np.array([0, len(mzs)]), ppm, charges=charges)
+    return binned[:2] if charges is None else (*binned[:2], binned[3])
@@ -1,18 +1,48 @@
+import hashlib
 import logging
+import os
+from collections import Counter, deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from itertools import chain
+from math import ceil
 from pathlib import Path
 
 import alphatims
 import alphatims.bruker
 import alphatims.utils
+import numpy as np
 import pandas as pd
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
 from tqdm.auto import tqdm
 
+from spectrum_io.config import config_context, get_config
+from spectrum_io.file import parquet
+from spectrum_io.instrumentation import Measurement, measure, path_size
+from spectrum_io.parallel import submit as submit_to_pool
+
+from .binning import BINNING_METHODS, bin_peaks, bin_spectra
 from .masterSpectrum import MasterSpectrum
 
 logger = logging.getLogger(__name__)
 
-
-def binning(mzs: list[float], intensities: list[int], ignore_charges: bool) -> tuple[list[float], list[float]]:
+# spectra are split into more chunks than workers, so that workers finishing early pick up the remaining chunks
+CHUNKS_PER_WORKER = 4
+# memory per raw peak while reading a batch: seven 8 byte columns, copied about three times by merges and groupbys
+BYTES_PER_RAW_PEAK = 3 * 7 * 8
+# binary peak data (*.tdf_bin) up to this size is hashed completely to key the hdf cache, larger files are sampled
+CACHE_KEY_FULL_BYTES = 64 * 1024**2
+CACHE_KEY_SAMPLE_BYTES = 1024**2
+
+
+def binning(
+    mzs: list[float],
+    intensities: list[int],
+    ignore_charges: bool,
+    method: str = "masterspectrum",
+    charges: list[int] | None = None,
+) -> tuple[list[float] | np.ndarray, ...]:
     """
     Perform binning on the input MasterSpectrum.
 
@@ -22,19 +52,176 @@ def binning(mzs: list[float], intensities: list[int], ignore_charges: bool) -> t
 
     :param intensities: Input data used to perform binning.
     :param mzs: Path where the temporary file will be exported.
-    :param ignore_charges: indicating whether charges should be ignored during binning.
-    :return: Tuple containing the sorted list of fragment mzs and associated intensities
+    :param ignore_charges: indicating whether charges should be ignored during binning. If False, only peaks of
+        the same charge are binned together and the charges of the binned peaks are returned as well.
+    :param method: the binning engine, either "masterspectrum", which inserts the peaks one by one into a
+        MasterSpectrum, or "vectorized", which bins all peaks at once using numpy, see
+        :func:`spectrum_io.d.binning.bin_peaks`. The vectorized engine returns numpy arrays instead of lists.
+    :param charges: the charges of the peaks, required if ignore_charges is False
+    :raises ValueError: if the binning method is not supported or charges are missing
+    :return: Tuple containing the sorted list of fragment mzs and associated intensities, followed by the
+        associated charges if ignore_charges is False, in which case the fragments are sorted by charge and mz
     """
+    if method not in BINNING_METHODS:
+        raise ValueError(f"Binning method {method} not supported. Choose one of {BINNING_METHODS}.")
+    if not ignore_charges and charges is None:
+        raise ValueError("Binning by charge requires the charges of the peaks.")
+    if method == "vectorized":
+        return bin_peaks(mzs, intensities, charges=None if ignore_charges else charges)
+
     ms = MasterSpectrum()
-    ms.load_from_tims(intensities, mzs, ignore_charges)
+    ms.load_from_tims(intensities, mzs, ignore_charges, charges=charges)
+
+    if ignore_charges:
+        mzs_out = [mp.mz for key in ms.spectrum[0].keys() for mp in ms.spectrum[0][key]]
+        intensities_out = [mp.intensity for key in ms.spectrum[0].keys() for mp in ms.spectrum[0][key]]
+        return mzs_out, intensities_out
+
+    master_peaks = [
+        (charge, mp)
+        for charge in sorted(ms.spectrum)
+        for key in ms.spectrum[charge].keys()
+        for mp in ms.spectrum[charge][key]
+    ]
+    return (
+        [mp.mz for _, mp in master_peaks],
+        [mp.intensity for _, mp in master_peaks],
+        [charge for charge, _ in master_peaks],
+    )
+
 
-    mzs_out = [mp.mz for key in ms.spectrum[0].keys() for mp in ms.spectrum[0][key]]
-    intensities_out = [mp.intensity for key in ms.spectrum[0].keys() for mp in ms.spectrum[0][key]]
+def _bin_chunk(
+    mzs: np.ndarray, intensities: np.ndarray, offsets: np.ndarray, method: str, charges: np.ndarray | None = None
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray | None]:
+    """
+    Bin consecutive spectra given as flat arrays, where spectrum i is found at offsets[i]:offsets[i + 1].
 
-    return mzs_out, intensities_out
+    If charges are given, peaks are binned by charge and the charges of the binned peaks are returned, else None.
+    """
+    if method == "vectorized":
+        if charges is None:
+            return (*bin_spectra(mzs, intensities, offsets), None)  # type: ignore[return-value]
+        return bin_spectra(mzs, intensities, offsets, charges=charges)  # type: ignore[return-value]
+    binned: list[tuple] = []
+    for start, end in zip(offsets[:-1], offsets[1:], strict=True):
+        spectrum_charges = None if charges is None else charges[start:end]
+        binned.append(
+            binning(mzs[start:end], intensities[start:end], charges is None, method=method, charges=spectrum_charges)
+        )
+    binned_offsets = np.cumsum([0] + [len(spectrum[0]) for spectrum in binned])
+    return (
+        np.concatenate([np.asarray(spectrum[0], dtype=np.float64) for spectrum in binned]),
+        np.concatenate([np.asarray(spectrum[1], dtype=np.float64) for spectrum in binned]),
+        binned_offsets,
+        None if charges is None else np.concatenate([np.asarray(spectrum[2], dtype=np.int64) for spectrum in binned]),
+    )
 
 
-def aggregate_timstof(raw_spectra: pd.DataFrame) -> pd.DataFrame:
+def _flatten(column: pd.Series, count: int) -> np.ndarray:
+    if count and isinstance(column.iloc[0], np.ndarray):
+        # spectra read by read_timstof are arrays, which are concatenated without iterating over their peaks
+        return np.concatenate(column.to_list()).astype(np.float64, copy=False)
+    return np.fromiter(chain.from_iterable(column), dtype=np.float64, count=count)
+
+
+class _Chunks:
+    """Contiguous chunks of the spectra of a DataFrame as flat arrays with offsets."""
+
+    def __init__(self, raw_spectra: pd.DataFrame, in_flight: int, n_chunks: int = 1, with_charges: bool = False):
+        """
+        Initialize _Chunks.
+
+        :param raw_spectra: pd.DataFrame containing the spectra as MZ and INTENSITIES lists
+        :param in_flight: number of chunks held in memory at the same time, which is used to limit the chunk size
+            such that they fit into the max_batch_bytes of the configuration
+        :param n_chunks: minimum number of chunks to split the spectra into
+        :param with_charges: whether to include the charges of the peaks from the CHARGES column
+        """
+        self.raw_spectra = raw_spectra
+        self.with_charges = with_charges
+        self.offsets = np.cumsum(np.concatenate(([0], raw_spectra["MZ"].map(len).to_numpy())))
+        n_spectra = len(raw_spectra)
+        n_arrays = 3 if with_charges else 2
+        bytes_per_spectrum = n_arrays * np.dtype(np.float64).itemsize * self.offsets[-1] / max(n_spectra, 1)
+        self.chunk_size = min(
+            max(ceil(n_spectra / n_chunks), 1), get_config().batch_rows(bytes_per_spectrum, in_flight=in_flight)
+        )
+        self.starts = range(0, n_spectra, self.chunk_size)
+
+    def get(self, start: int) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray | None]:
+        """
+        Get the chunk starting at the given spectrum.
+
+        :param start: position of the first spectrum of the chunk
+        :return: a tuple of the flat mzs, intensities, the offsets of the spectra of the chunk and the flat charges,
+            which are None if the chunks are created without charges
+        """
+        end = min(start + self.chunk_size, len(self.raw_spectra))
+        count = self.offsets[end] - self.offsets[start]
+        charges = None
+        if self.with_charges:
+            charges = _flatten(self.raw_spectra["CHARGES"].iloc[start:end], count).astype(np.int64)
+        return (
+            _flatten(self.raw_spectra["MZ"].iloc[start:end], count),
+            _flatten(self.raw_spectra["INTENSITIES"].iloc[start:end], count),
+            self.offsets[start : end + 1] - self.offsets[start],
+            charges,
+        )
+
+
+def _aggregate_chunks(
+    raw_spectra: pd.DataFrame, binning_method: str, n_workers: int, ignore_charges: bool, measurement: Measurement
+) -> dict[str, list[np.ndarray]]:
+    """
+    Bin spectra in chunks, using the shared worker pool if n_workers > 1 and keeping at most n_workers in flight.
+
+    Chunks are sent to the workers as flat arrays with offsets, which are much cheaper to pickle than lists.
+    """
+    if n_workers > 1:
+        chunks = _Chunks(
+            raw_spectra, in_flight=n_workers, n_chunks=n_workers * CHUNKS_PER_WORKER, with_charges=not ignore_charges
+        )
+
+        def submit(start: int):
+            mzs, intensities, offsets, charges = chunks.get(start)
+            return submit_to_pool(_bin_chunk, mzs, intensities, offsets, binning_method, charges)
+
+    else:
+        chunks = _Chunks(raw_spectra, in_flight=1, with_charges=not ignore_charges)
+
+        def submit(start: int):
+            mzs, intensities, offsets, charges = chunks.get(start)
+            future: Future = Future()
+            future.set_result(_bin_chunk(mzs, intensities, offsets, binning_method, charges))
+            return future
+
+    starts = iter(chunks.starts)
+    pending = deque(submit(start) for _, start in zip(range(n_workers), starts, strict=False))
+    columns: dict[str, list[np.ndarray]] = {"MZ": [], "INTENSITIES": []}
+    if not ignore_charges:
+        columns["CHARGES"] = []
+    with tqdm(total=len(raw_spectra), desc="Aggregating spectra") as progress:
+        while pending:
+            # chunks are collected in submission order, so results are reassembled in the order of raw_spectra
+            binned_mzs, binned_intensities, binned_offsets, binned_charges = pending.popleft().result()
+            next_start = next(starts, None)
+            if next_start is not None:
+                pending.append(submit(next_start))
+            columns["MZ"].extend(np.split(binned_mzs, binned_offsets[1:-1]))
+            columns["INTENSITIES"].extend(np.split(binned_intensities, binned_offsets[1:-1]))
+            if binned_charges is not None:
+                columns["CHARGES"].extend(np.split(binned_charges, binned_offsets[1:-1]))
+            progress.update(len(binned_offsets) - 1)
+            measurement.add(spectra=len(binned_offsets) - 1, peaks=len(binned_mzs))
+    return columns
+
+
+def aggregate_timstof(
+    raw_spectra: pd.DataFrame,
+    binning_method: str = "masterspectrum",
+    n_workers: int | None = 1,
+    ignore_charges: bool = True,
+) -> pd.DataFrame:
     """
     Combine spectra from the provided pd.DataFrame and perform binning on chunks.
 
@@ -42,33 +229,174 @@ def aggregate_timstof(raw_spectra: pd.DataFrame) -> pd.DataFrame:
     merges the binning results with the original data, processes the combined spectra, and returns
     the combined and processed spectra as a pd.DataFrame.
 
+    With the vectorized binning method, all spectra of a chunk are binned at once, see
+    :func:`spectrum_io.d.binning.bin_spectra`. With more than one worker, chunks of spectra are binned in parallel
+    by the shared worker pool (see :mod:`spectrum_io.parallel`) and the results are reassembled in the original
+    order. In both cases, as well as when binning by charge, the binned mzs and intensities of each spectrum are
+    numpy arrays.
+
     :param raw_spectra: pd.DataFrame containing spectra information.
+    :param binning_method: the binning engine, see :func:`binning`
+    :param n_workers: maximum number of chunks binned in parallel. If 1, spectra are binned in this process.
+        If None, the max_workers of the configuration are used.
+    :param ignore_charges: whether to ignore the charges of the peaks. If False, raw_spectra must contain the charge
+        of each peak in a CHARGES column, peaks are only binned with peaks of the same charge, and CHARGES is replaced
+        by the charges of the binned peaks.
+    :raises ValueError: if ignore_charges is False and raw_spectra has no CHARGES column
     :return: pd.DataFrame containing combined and processed spectra.
     """
-    for i, (combined_intensities, combined_mzs) in tqdm(
-        enumerate(zip(raw_spectra["INTENSITIES"], raw_spectra["MZ"], strict=False)),
-        total=len(raw_spectra),
-        desc="Aggregating spectra",
-    ):
-        mz, intensity = binning(combined_mzs, combined_intensities, True)
-        raw_spectra.at[i, "INTENSITIES"] = intensity
-        raw_spectra.at[i, "MZ"] = mz
+    if not ignore_charges and "CHARGES" not in raw_spectra.columns:
+        raise ValueError("Binning by charge requires the charges of the peaks in a CHARGES column.")
+    if n_workers is None:
+        n_workers = get_config().workers
+    with measure("d.aggregate_timstof", n_workers=n_workers) as measurement:
+        if (n_workers > 1 and len(raw_spectra) > 1) or binning_method == "vectorized" or not ignore_charges:
+            for column, values in _aggregate_chunks(
+                raw_spectra, binning_method, n_workers, ignore_charges, measurement
+            ).items():
+                raw_spectra[column] = values
+            return raw_spectra
+        for i, (combined_intensities, combined_mzs) in tqdm(
+            enumerate(zip(raw_spectra["INTENSITIES"], raw_spectra["MZ"], strict=False)),
+            total=len(raw_spectra),
+            desc="Aggregating spectra",
+        ):
+            mz, intensity = binning(combined_mzs, combined_intensities, True, method=binning_method)
+            raw_spectra.at[i, "INTENSITIES"] = intensity
+            raw_spectra.at[i, "MZ"] = mz
+            measurement.add(spectra=1, peaks=len(mz))
 
     return raw_spectra
 
 
-def read_timstof(hdf_file: Path, scan_to_precursor_map: pd.DataFrame) -> pd.DataFrame:
+def _batch_labels(scan_to_precursor_map: pd.DataFrame, frames_per_batch: int) -> np.ndarray:
+    """
+    Assign the rows of the scan to precursor map to batches of about frames_per_batch frames.
+
+    Rows sharing a scan number or a precursor are aggregated together, so they form connected groups that are always
+    assigned to the same batch, and the results of a batch do not depend on any other batch. Groups are ordered by
+    their first frame, such that each batch covers a range of frames.
+
+    :param scan_to_precursor_map: Dataframe containing metadata to select spectra
+    :param frames_per_batch: number of frames per batch
+    :return: the batch of each row
+    """
+    if scan_to_precursor_map.empty:
+        return np.zeros(0, dtype=np.int64)
+    scan_codes = pd.factorize(scan_to_precursor_map["SCAN_NUMBER"])[0]
+    precursor_codes = pd.factorize(scan_to_precursor_map["PRECURSOR"])[0]
+    n_scans = scan_codes.max() + 1
+    n_nodes = n_scans + precursor_codes.max() + 1
+    graph = coo_matrix((np.ones(len(scan_codes)), (scan_codes, precursor_codes + n_scans)), shape=(n_nodes, n_nodes))
+    groups = connected_components(graph, directed=False)[1][scan_codes]
+    frames_by_group = pd.DataFrame({"GROUP": groups, "FRAME": scan_to_precursor_map["FRAME"].to_numpy()})
+    group_frames = frames_by_group.groupby("GROUP")["FRAME"].agg(["min", "nunique"]).sort_values("min")
+    group_batches = (np.cumsum(group_frames["nunique"].to_numpy()) - 1) // frames_per_batch
+    return pd.Series(group_batches, index=group_frames.index).loc[groups].to_numpy()
+
+
+def _frames_per_batch(data: alphatims.bruker.TimsTOF) -> int:
+    """Number of frames whose raw peaks and their aggregation fit into the max_batch_bytes of the configuration."""
+    peaks_per_frame = data.intensity_values.size / max(data.frame_max_index, 1)
+    return get_config().batch_rows(peaks_per_frame * BYTES_PER_RAW_PEAK)
+
+
+def _check_mobility_window(mobility_window: float | None):
+    if mobility_window is not None and not mobility_window > 0:
+        raise ValueError(f"mobility_window must be a positive width of inverse ion mobility, got {mobility_window}.")
+
+
+def iter_timstof(
+    hdf_file: Path,
+    scan_to_precursor_map: pd.DataFrame,
+    frames_per_batch: int | None = None,
+    keep_mobility: bool = False,
+    mobility_window: float | None = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Lazily read selected spectra from a given timstof hdf file in batches of frames.
+
+    Only the raw peaks of the frames of one batch are held in memory at a time and aggregated to spectra before
+    the next batch is read, see :func:`read_timstof` for the format of the yielded spectra.
+    Spectra of the same scan number, as well as those sharing a precursor, are always read in the same batch.
+
+    :param hdf_file: Path to hdf file or bruker d folder containing spectra
+    :param scan_to_precursor_map: Dataframe containing metadata to select spectra
+    :param frames_per_batch: approximate number of frames read per batch. If None, it is chosen such that the raw
+        peaks of a batch fit into the max_batch_bytes of the configuration.
+    :param keep_mobility: whether to keep the inverse ion mobility of each peak, see :func:`read_timstof`
+    :param mobility_window: optional width of inverse ion mobility windows to aggregate peaks within, see
+        :func:`read_timstof`
+    :yield: Dataframes containing the aggregated spectra of consecutive batches
+    """
+    data = alphatims.bruker.TimsTOF(str(hdf_file), slice_as_dataframe=False)
+    if frames_per_batch is None:
+        frames_per_batch = _frames_per_batch(data)
+    batch_labels = _batch_labels(scan_to_precursor_map, frames_per_batch)
+    for batch in np.unique(batch_labels):
+        batch_map = scan_to_precursor_map[batch_labels == batch]
+        with measure("d.iter_timstof", path=hdf_file, batch=int(batch)) as measurement:
+            spectra = _read_batch(data, batch_map, keep_mobility, mobility_window)
+            measurement.add(spectra=len(spectra))
+        yield spectra
+
+
+def read_timstof(
+    hdf_file: Path,
+    scan_to_precursor_map: pd.DataFrame,
+    frames_per_batch: int | None = None,
+    keep_mobility: bool = False,
+    mobility_window: float | None = None,
+) -> pd.DataFrame:
     """
     Read selected spectra from a given timstof hdf file.
 
     This function queries a given hdf file for spectra that are provided within a scan to precursor map.
+    The raw peaks are read and aggregated in batches of frames, see :func:`iter_timstof`, so the memory needed
+    is proportional to the size of a batch and the aggregated spectra.
+    By default, the inverse ion mobility of a spectrum is summarized by its median_INV_ION_MOBILITY. Per-peak
+    mobilities and mobility windows are taken from the same pass over the raw peaks, see
+    :func:`aggregate_raw_indices`.
     #TODO elaborate
 
-    :param hdf_file: Path to hdf file containing spectra
+    :param hdf_file: Path to hdf file or bruker d folder containing spectra
     :param scan_to_precursor_map: Dataframe containing metadata to select spectra
-
-    :return: Dataframe containing the relevant spectra read from the hdf file
+    :param frames_per_batch: approximate number of frames read per batch, see :func:`iter_timstof`
+    :param keep_mobility: whether to add the inverse ion mobility of each peak as INV_ION_MOBILITY column, aligned
+        with the MZ and INTENSITIES of each spectrum
+    :param mobility_window: optional width of inverse ion mobility windows in Vs/cm2. If given, the peaks of each
+        scan number are split into one spectrum per window, whose lower bound is given in an
+        INV_ION_MOBILITY_WINDOW column.
+    :raises ValueError: if mobility_window is not positive
+
+    :return: Dataframe containing the relevant spectra read from the hdf file, sorted by SCAN_NUMBER
     """
+    _check_mobility_window(mobility_window)
+    with measure("d.read_timstof", path=hdf_file) as measurement:
+        df_combined_grouped = (
+            pd.concat(
+                list(iter_timstof(hdf_file, scan_to_precursor_map, frames_per_batch, keep_mobility, mobility_window)),
+                ignore_index=True,
+            )
+            .sort_values("SCAN_NUMBER", kind="stable")
+            .reset_index(drop=True)
+        )
+        if measurement.enabled:
+            measurement.add(
+                bytes_read=path_size(hdf_file),
+                spectra=len(df_combined_grouped),
+                peaks=df_combined_grouped["MZ"].map(len).sum(),
+            )
+    return df_combined_grouped
+
+
+def _read_batch(
+    data: alphatims.bruker.TimsTOF,
+    scan_to_precursor_map: pd.DataFrame,
+    keep_mobility: bool = False,
+    mobility_window: float | None = None,
+) -> pd.DataFrame:
+    """Read the spectra of a batch, with the MZ and INTENSITIES of each spectrum as views into flat arrays."""
     # preparation of filter
     df_frame_group = (
         scan_to_precursor_map[["FRAME", "PRECURSOR"]]
@@ -83,67 +411,129 @@ def read_timstof(hdf_file: Path, scan_to_precursor_map: pd.DataFrame) -> pd.Data
         .agg({"FRAME": tuple})
     )
 
-    # load filtered stuff
-    data = alphatims.bruker.TimsTOF(str(hdf_file), slice_as_dataframe=False)
-
-    raw_idx = []
-    for frames, precursors in zip(df_frame_group["FRAME"], df_frame_group["PRECURSOR"], strict=False):
-        raw_idx.extend(data[frames, :, precursors])
-
-    # read spectra
-    df = data.as_dataframe(
-        raw_idx,
-        raw_indices=False,
-        frame_indices=True,
-        scan_indices=True,
-        quad_indices=False,
-        tof_indices=False,
-        precursor_indices=True,
-        rt_values=True,
-        rt_values_min=False,
-        mobility_values=True,
-        quad_mz_values=False,
-        push_indices=False,
-        mz_values=True,
-        intensity_values=True,
-        corrected_intensity_values=False,
-        raw_indices_sorted=False,
+    raw_idx = np.concatenate(
+        [np.zeros(0, dtype=np.int64)]
+        + [
+            data[frames, :, precursors]
+            for frames, precursors in zip(df_frame_group["FRAME"], df_frame_group["PRECURSOR"], strict=False)
+        ]
     )
-    df.columns = ["FRAME", "SCAN", "PRECURSOR", "RETENTION_TIME", "INV_ION_MOBILITY", "MZ", "INTENSITIES"]
-
-    # converting RETENTION TIME from seconds to minutes
-    df["RETENTION_TIME"] = df["RETENTION_TIME"].div(60)
-
-    # aggregation
-    df_combined_grouped = (
-        df.merge(
-            scan_to_precursor_map[
-                ["SCAN_NUM_BEGIN", "SCAN_NUM_END", "PRECURSOR", "FRAME", "COLLISION_ENERGY"]
-            ].drop_duplicates()
-        )
-        .query("SCAN_NUM_BEGIN <= SCAN <= SCAN_NUM_END")  # can probably be skipped
-        .groupby(["PRECURSOR", "FRAME"], as_index=False)  # aggregate fragments per precursor in FRAME
-        .agg(
-            {
-                "INTENSITIES": list,
-                "MZ": list,
-                "RETENTION_TIME": "first",
-                "COLLISION_ENERGY": "first",
-                "INV_ION_MOBILITY": "first",
-            }
-        )
-        .merge(scan_to_precursor_map.reset_index())
-        .groupby("SCAN_NUMBER", as_index=False)  # aggregate PRECURSORS for same SCAN_NUMBER
-        .agg(
-            COLLISION_ENERGY=("COLLISION_ENERGY", "median"),
-            INTENSITIES=("INTENSITIES", lambda x: [item for sublist in x for item in sublist]),
-            MZ=("MZ", lambda x: [item for sublist in x for item in sublist]),
-            RETENTION_TIME=("RETENTION_TIME", "median"),
-            median_INV_ION_MOBILITY=("INV_ION_MOBILITY", "median"),
-        )
+    spectra, mzs, intensities, offsets, *mobilities = aggregate_raw_indices(
+        data, raw_idx, scan_to_precursor_map, keep_mobility, mobility_window
     )
-
-    return df_combined_grouped
+    columns = {"INTENSITIES": intensities, "MZ": mzs}
+    if keep_mobility:
+        columns["INV_ION_MOBILITY"] = mobilities[0]
+    start = spectra.columns.get_loc("COLLISION_ENERGY") + 1
+    for position, (column, values) in enumerate(columns.items(), start=start):
+        spectra.insert(position, column, np.split(values, offsets[1:-1]) if len(spectra) else [])
+    return spectra
+
+
+def aggregate_raw_indices(
+    data: alphatims.bruker.TimsTOF,
+    raw_idx: np.ndarray,
+    scan_to_precursor_map: pd.DataFrame,
+    keep_mobility: bool = False,
+    mobility_window: float | None = None,
+) -> tuple[pd.DataFrame, np.ndarray, ...]:
+    """
+    Aggregate raw peaks of a timstof file to spectra per scan number using sorted index arrays.
+
+    Each raw peak is assigned to the rows of the scan to precursor map with its frame and precursor, if its scan lies
+    within their SCAN_NUM_BEGIN and SCAN_NUM_END. The assigned peaks are sorted by (SCAN_NUMBER, PRECURSOR, FRAME),
+    keeping the order of the raw indices within each frame, and the spectra are delimited by the positions where
+    the scan number changes. Only the metadata of the (PRECURSOR, FRAME) groups is aggregated using pandas, so no
+    Python objects are created per peak.
+    If a mobility window is given, the peaks of each scan number are further split by the window of inverse ion
+    mobility they fall into, i.e. floor(mobility / mobility_window), within the same sort.
+
+    :param data: the timstof file
+    :param raw_idx: raw indices of the peaks to aggregate
+    :param scan_to_precursor_map: Dataframe containing metadata to select spectra
+    :param keep_mobility: whether to return the inverse ion mobility of each peak
+    :param mobility_window: optional width of the inverse ion mobility windows in Vs/cm2 to aggregate peaks within
+    :raises ValueError: if mobility_window is not positive
+    :return: a tuple of a Dataframe with the columns SCAN_NUMBER, COLLISION_ENERGY, RETENTION_TIME and
+        median_INV_ION_MOBILITY of each spectrum, sorted by SCAN_NUMBER, and the flat mz values, intensities and
+        offsets of the spectra, where the peaks of spectrum i are found at offsets[i]:offsets[i + 1], followed by the
+        flat inverse ion mobilities of the peaks if keep_mobility is set. If a mobility window is given, there is a
+        spectrum per scan number and window, which has the lower bound of its window in an INV_ION_MOBILITY_WINDOW
+        column and which are sorted by SCAN_NUMBER and INV_ION_MOBILITY_WINDOW.
+    """
+    _check_mobility_window(mobility_window)
+    peaks = data.convert_from_indices(
+        np.sort(raw_idx),
+        return_frame_indices=True,
+        return_scan_indices=True,
+        return_precursor_indices=True,
+        return_rt_values=True,
+        return_mobility_values=True,
+        return_mz_values=True,
+        return_intensity_values=True,
+        raw_indices_sorted=True,
+    )
+    windows = scan_to_precursor_map[
+        ["SCAN_NUMBER", "PRECURSOR", "FRAME", "SCAN_NUM_BEGIN", "SCAN_NUM_END", "COLLISION_ENERGY"]
+    ].drop_duplicates()
+    # rank of (SCAN_NUMBER, PRECURSOR, FRAME), which is the order of the peaks in the aggregated spectra
+    group_ranks = windows.groupby(["SCAN_NUMBER", "PRECURSOR", "FRAME"]).ngroup().to_numpy()
+    scan_ranks = windows.groupby("SCAN_NUMBER").ngroup().to_numpy()
+
+    # join peaks to windows on (FRAME, PRECURSOR) using a single int64 key
+    n_precursors = max(windows["PRECURSOR"].max(), peaks["precursor_indices"].max(initial=0)) + 1
+    window_keys = windows["FRAME"].to_numpy(np.int64) * n_precursors + windows["PRECURSOR"].to_numpy(np.int64)
+    window_order = np.argsort(window_keys, kind="stable")
+    sorted_window_keys = window_keys[window_order]
+    peak_keys = peaks["frame_indices"].astype(np.int64) * n_precursors + peaks["precursor_indices"]
+    first = np.searchsorted(sorted_window_keys, peak_keys, "left")
+    counts = np.searchsorted(sorted_window_keys, peak_keys, "right") - first
+    peak_idx = np.repeat(np.arange(peak_keys.size), counts)
+    window_idx = window_order[np.repeat(first - (np.cumsum(counts) - counts), counts) + np.arange(peak_idx.size)]
+    scans = peaks["scan_indices"][peak_idx]
+    in_window = (windows["SCAN_NUM_BEGIN"].to_numpy()[window_idx] <= scans) & (
+        scans <= windows["SCAN_NUM_END"].to_numpy()[window_idx]
+    )
+    peak_idx, window_idx = peak_idx[in_window], window_idx[in_window]
+
+    # peak_idx follows the sorted raw indices, so it orders the peaks within each group
+    order = np.argsort(group_ranks[window_idx].astype(np.int64) * max(peak_keys.size, 1) + peak_idx, kind="stable")
+    peak_idx, window_idx = peak_idx[order], window_idx[order]
+    spectrum_keys = scan_ranks[window_idx].astype(np.int64)
+    if mobility_window is not None:
+        mobility_bins = np.floor(peaks["mobility_values"][peak_idx] / mobility_window).astype(np.int64)
+        bin_values, bin_codes = np.unique(mobility_bins, return_inverse=True)
+        spectrum_keys = spectrum_keys * max(bin_values.size, 1) + bin_codes
+        # a stable sort by (SCAN_NUMBER, window) keeps the order by (PRECURSOR, FRAME) within each spectrum
+        order = np.argsort(spectrum_keys, kind="stable")
+        peak_idx, window_idx, spectrum_keys = peak_idx[order], window_idx[order], spectrum_keys[order]
+        mobility_bins = mobility_bins[order]
+    group_starts = np.flatnonzero(np.diff(group_ranks[window_idx], prepend=-1) | np.diff(spectrum_keys, prepend=-1))
+    group_windows = window_idx[group_starts]
+    group_peaks = peak_idx[group_starts]
+    group_metadata = {
+        "SCAN_NUMBER": windows["SCAN_NUMBER"].to_numpy()[group_windows],
+        "COLLISION_ENERGY": windows["COLLISION_ENERGY"].to_numpy()[group_windows],
+        # converting RETENTION TIME from seconds to minutes
+        "RETENTION_TIME": peaks["rt_values"][group_peaks] / 60,
+        "median_INV_ION_MOBILITY": peaks["mobility_values"][group_peaks],
+    }
+    spectrum_columns = ["SCAN_NUMBER"]
+    if mobility_window is not None:
+        group_metadata["INV_ION_MOBILITY_WINDOW"] = mobility_bins[group_starts] * mobility_window
+        spectrum_columns.append("INV_ION_MOBILITY_WINDOW")
+    spectra = pd.DataFrame(group_metadata).groupby(spectrum_columns, as_index=False).median()
+    scan_starts = group_starts[np.flatnonzero(np.diff(spectrum_keys[group_starts], prepend=-1))]
+    offsets = np.append(scan_starts, peak_idx.size)
+    aggregated = (
+        spectra,
+        peaks["mz_values"][peak_idx].astype(np.float64),
+        peaks["intensity_values"][peak_idx].astype(np.float64),
+        offsets,
+    )
+    if keep_mobility:
+        return (*aggregated, peaks["mobility_values"][peak_idx].astype(np.float64))
+    return aggregated
 
 
 def convert_d_hdf(
@@ -158,7 +548,7 @@ def convert_d_hdf(
     :param output_path: Path to the desired output location of the converted hdf file
     """
     if isinstance(output_path, str):
-        output_path = Path(input_path)
+        output_path = Path(output_path)
     if output_path.is_file():
         logger.info(f"Found converted file at {output_path}, skipping conversion")
         return
@@ -167,20 +557,232 @@ def convert_d_hdf(
     data.save_as_hdf(directory=str(output_path.parent), file_name=str(output_path.name))
 
 
-def read_and_aggregate_timstof(source: Path, tims_meta_file: Path) -> pd.DataFrame:
+def _content_key(d_folder: Path) -> str:
     """
-    Read raw spectra from timstof hdf spectra file and aggregate to MS2 spectra.
+    Hash the names, sizes and contents of the files of a bruker d folder.
 
-    :param source: Path to the hdf file
+    Unlike the fingerprints of search results, which are small enough to be hashed completely, the binary peak data
+    (*.tdf_bin) of a run can be tens of GB. Peak data larger than CACHE_KEY_FULL_BYTES is therefore only sampled at
+    its start and end, and keyed by its modification time in addition, so that it is not read to look up the cache.
+    All other files, including the analysis.tdf database describing the frames, are hashed completely. A run that
+    is copied without preserving modification times is converted again.
+    """
+    digest = hashlib.sha256()
+    for path in sorted(path for path in d_folder.rglob("*") if path.is_file()):
+        stat = path.stat()
+        sampled = path.suffix == ".tdf_bin" and stat.st_size > CACHE_KEY_FULL_BYTES
+        key = f"{path.relative_to(d_folder).as_posix()}:{stat.st_size}"
+        digest.update(f"{key}:{stat.st_mtime_ns}\n".encode() if sampled else f"{key}\n".encode())
+        with open(path, "rb") as file:
+            if sampled:
+                digest.update(file.read(CACHE_KEY_SAMPLE_BYTES))
+                file.seek(-CACHE_KEY_SAMPLE_BYTES, os.SEEK_END)
+                digest.update(file.read())
+            else:
+                while block := file.read(CACHE_KEY_SAMPLE_BYTES):
+                    digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_timstof_hdf(d_folder: Path | str, cache_dir: Path | str | None = None) -> Path:
+    """
+    Get an hdf copy of a bruker d folder from a cache, converting the d folder on the first call.
+
+    Cached files are keyed by the content of the d folder, so a run that is moved or renamed is still found in the
+    cache, while a changed run with the same name is converted again. Conversion writes to a temporary file that is
+    renamed when complete, so an interrupted conversion never leaves a truncated file in the cache.
+
+    :param d_folder: Path to the d folder
+    :param cache_dir: directory of the cached hdf files. If None, a subdirectory of the temp_dir of the configuration
+        is used.
+    :return: Path to the cached hdf file
+    """
+    d_folder = Path(d_folder)
+    cache_dir = Path(cache_dir) if cache_dir is not None else get_config().get_temp_dir() / "timstof_hdf"
+    hdf_file = cache_dir / f"{d_folder.stem}.{_content_key(d_folder)[:16]}.hdf"
+    if hdf_file.is_file():
+        logger.info(f"Found cached hdf file at {hdf_file}, skipping conversion")
+        return hdf_file
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    tmp_file = cache_dir / f".{hdf_file.name}.{os.getpid()}.tmp"
+    logger.info(f"Converting {d_folder} to cached hdf file {hdf_file} using alphatims...")
+    try:
+        data = alphatims.bruker.TimsTOF(str(d_folder))
+        data.save_as_hdf(directory=str(cache_dir), file_name=tmp_file.name, overwrite=True)
+        os.replace(tmp_file, hdf_file)
+    finally:
+        tmp_file.unlink(missing_ok=True)
+    return hdf_file
+
+
+def read_and_aggregate_timstof(
+    source: Path | str,
+    tims_meta_file: Path,
+    binning_method: str = "masterspectrum",
+    n_workers: int | None = 1,
+    frames_per_batch: int | None = None,
+    cache_hdf: bool = False,
+    mobility_window: float | None = None,
+) -> pd.DataFrame:
+    """
+    Read raw spectra from timstof hdf spectra file or bruker d folder and aggregate to MS2 spectra.
+
+    Raw spectra are read and aggregated batch by batch, see :func:`iter_timstof`, so only the raw spectra of one
+    batch are held in memory at a time. A d folder is read directly, without writing an hdf copy, unless cache_hdf
+    is set.
+
+    :param source: Path to the hdf file or d folder
     :param tims_meta_file: Path to metadata mapping scan numbers to precursors / frames
+    :param binning_method: the binning engine, see :func:`binning`
+    :param n_workers: maximum number of processes binning spectra in parallel, see :func:`aggregate_timstof`
+    :param frames_per_batch: approximate number of frames read per batch, see :func:`iter_timstof`
+    :param cache_hdf: whether to read a d folder from a cached hdf copy, see :func:`cache_timstof_hdf`, which is
+        faster when the same run is read repeatedly
+    :param mobility_window: optional width of inverse ion mobility windows in Vs/cm2 to aggregate spectra within,
+        see :func:`read_timstof`
+    :raises ValueError: if mobility_window is not positive
     :return: Dataframe containing the MS2 spectra
     """
+    _check_mobility_window(mobility_window)
+    source = Path(source)
+    timstof_file = cache_timstof_hdf(source) if cache_hdf and source.is_dir() else source
     scan_to_precursor_map = pd.read_csv(tims_meta_file)
-    raw_spectra = read_timstof(source, scan_to_precursor_map)
-    df_combined = aggregate_timstof(raw_spectra)
+    df_combined = (
+        pd.concat(
+            [
+                aggregate_timstof(raw_spectra, binning_method=binning_method, n_workers=n_workers)
+                for raw_spectra in iter_timstof(
+                    timstof_file, scan_to_precursor_map, frames_per_batch, mobility_window=mobility_window
+                )
+            ],
+            ignore_index=True,
+        )
+        .sort_values("SCAN_NUMBER", kind="stable")
+        .reset_index(drop=True)
+    )
     df_combined["RAW_FILE"] = source.stem
     df_combined["MASS_ANALYZER"] = "TOF"
     df_combined["FRAGMENTATION"] = "HCD"
     df_combined["INSTRUMENT_TYPES"] = "TIMSTOF"
 
     return df_combined
+
+
+def _aggregate_run(
+    source: Path, tims_meta_file: Path, output_file: Path, max_batch_bytes: int, **kwargs
+) -> tuple[Path, int]:
+    """
+    Aggregate the spectra of one run within the given memory budget and write them to a Parquet file.
+
+    The binned spectra are flattened into mz and intensity buffers once and written as large_list columns with
+    :func:`spectrum_io.file.parquet.write_spectra`, instead of converting the array of every spectrum separately.
+    """
+    with config_context(max_batch_bytes=max_batch_bytes):
+        df_combined = read_and_aggregate_timstof(source, tims_meta_file, n_workers=1, **kwargs)
+    offsets = np.cumsum(np.concatenate(([0], df_combined["MZ"].map(len).to_numpy())))
+    mzs = _flatten(df_combined["MZ"], offsets[-1])
+    intensities = _flatten(df_combined["INTENSITIES"], offsets[-1])
+    metadata = df_combined.drop(columns=["MZ", "INTENSITIES"])
+    # written to a temporary file first, so that an existing output file is always complete
+    tmp_file = output_file.with_name(f".{output_file.name}.{os.getpid()}.tmp")
+    try:
+        parquet.write_spectra(metadata, mzs, intensities, offsets, tmp_file)
+        os.replace(tmp_file, output_file)
+    finally:
+        tmp_file.unlink(missing_ok=True)
+    return output_file, len(df_combined)
+
+
+def read_and_aggregate_timstof_runs(
+    runs: Iterable[tuple[Path | str, Path | str]],
+    output_dir: Path | str,
+    binning_method: str = "masterspectrum",
+    n_workers: int | None = None,
+    frames_per_batch: int | None = None,
+    cache_hdf: bool = False,
+    mobility_window: float | None = None,
+    overwrite: bool = False,
+) -> list[Path]:
+    """
+    Read and aggregate the MS2 spectra of many timstof runs, writing the spectra of each run to a Parquet file.
+
+    Runs are processed concurrently by the shared worker pool (see :mod:`spectrum_io.parallel`), each run by a
+    single worker using :func:`read_and_aggregate_timstof`. The max_batch_bytes of the configuration are split
+    among the workers, so the raw peaks read by all workers at the same time stay within the configured limit. The
+    spectra of each run are written to <output_dir>/<run name>.parquet as soon as the run is complete, so finished
+    runs are kept if a later run fails.
+
+    :param runs: pairs of the hdf file or d folder of a run and its metadata mapping scan numbers to precursors /
+        frames
+    :param output_dir: directory to write the Parquet files to, which is created if necessary
+    :param binning_method: the binning engine, see :func:`binning`
+    :param n_workers: maximum number of runs processed in parallel. If 1, runs are processed in this process.
+        If None, the max_workers of the configuration are used.
+    :param frames_per_batch: approximate number of frames read per batch, see :func:`iter_timstof`
+    :param cache_hdf: whether to read d folders from cached hdf copies, see :func:`cache_timstof_hdf`
+    :param mobility_window: optional width of inverse ion mobility windows to aggregate spectra within, see
+        :func:`read_timstof`
+    :param overwrite: whether to process runs whose Parquet file already exists. If False, these runs are skipped,
+        so an interrupted batch can be resumed.
+    :raises ValueError: if several runs have the same name, which would be written to the same Parquet file, or if
+        mobility_window is not positive
+    :return: the paths of the Parquet files, in the order of the runs
+    """
+    _check_mobility_window(mobility_window)
+    runs = [(Path(source), Path(tims_meta_file)) for source, tims_meta_file in runs]
+    output_dir = Path(output_dir)
+    output_files = [output_dir / f"{source.stem}.parquet" for source, _ in runs]
+    duplicates = sorted(name for name, count in Counter(file.name for file in output_files).items() if count > 1)
+    if duplicates:
+        raise ValueError(f"Runs must have unique names, but found several runs writing to {duplicates}.")
+    output_dir.mkdir(parents=True, exist_ok=True)
+    todo = [
+        (source, tims_meta_file, output_file)
+        for (source, tims_meta_file), output_file in zip(runs, output_files, strict=True)
+        if overwrite or not output_file.is_file()
+    ]
+    if len(todo) < len(runs):
+        logger.info(f"Skipping {len(runs) - len(todo)} runs with existing output files in {output_dir}")
+    if n_workers is None:
+        n_workers = get_config().workers
+    n_workers = max(1, min(n_workers, len(todo)))
+    kwargs = {
+        "max_batch_bytes": max(1, get_config().max_batch_bytes // n_workers),
+        "binning_method": binning_method,
+        "frames_per_batch": frames_per_batch,
+        "cache_hdf": cache_hdf,
+        "mobility_window": mobility_window,
+    }
+    if n_workers > 1:
+
+        def submit(run: tuple[Path, Path, Path]) -> Future:
+            return submit_to_pool(_aggregate_run, *run, **kwargs)
+
+    else:
+
+        def submit(run: tuple[Path, Path, Path]) -> Future:
+            future: Future = Future()
+            future.set_result(_aggregate_run(*run, **kwargs))
+            return future
+
+    with (
+        measure("d.read_and_aggregate_timstof_runs", n_workers=n_workers) as measurement,
+        tqdm(total=len(todo), desc="Aggregating runs") as progress,
+    ):
+        queue = iter(todo)
+        pending = {submit(run) for _, run in zip(range(n_workers), queue, strict=False)}
+        try:
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    output_file, n_spectra = future.result()
+                    logger.info(f"Wrote {n_spectra} spectra to {output_file}")
+                    measurement.add(runs=1, spectra=n_spectra)
+                    progress.update()
+                    run = next(queue, None)
+                    if run is not None:
+                        pending.add(submit(run))
+        finally:
+            for future in pending:
+                future.cancel()
+    return output_files
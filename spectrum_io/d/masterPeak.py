@@ -13,6 +13,8 @@ MasterPeakT = TypeVar("MasterPeakT", bound="MasterPeak")
 class MasterPeak(Peak):
     """Container class for a aggregated, summed up fragment peak."""
 
+    __slots__ = ("right", "rel_intensity_ratio", "counts_ratio", "mz_origin")
+
     def __init__(self, peak: Peak):
         """
         Contructor for a master peak.
@@ -28,52 +30,34 @@ class MasterPeak(Peak):
         # ratio is set to an actual value first time by comparing a spectrum to another spectrum
         self.counts_ratio = 0.0
         self.mz_origin = peak.mz
-        super().__init__(peak.mz, peak.intensity, peak.delta_function, meta=peak.meta)
+        super().__init__(peak.mz, peak.intensity, peak.delta_function, meta=peak._meta)
         # update does not have to be called, because constructor
         # of peak calls update of MasterPeak
         # self.update()
 
     def __eq__(self, other: MasterPeakT) -> bool:  # type: ignore
         """
-        Reports true if both master peaks have the same member variables!
+        Reports true if both master peaks have the same counts, mz, borders and origin.
 
         :param other: the other master peak object to compare this object with
         :return: whether or not the two objects are equal
         """
-        if self.__dict__ == other.__dict__:
-            return True
-        else:
-            if (
-                (self.counts == other.counts)
-                & (self.mz == other.mz)
-                & (self.left == other.left)
-                & (self.right == other.right)
-                & (self.mz_origin == other.mz_origin)
-            ):
-                return True
-            else:
-                return False
+        return (
+            (self.counts == other.counts)
+            & (self.mz == other.mz)
+            & (self.left == other.left)
+            & (self.right == other.right)
+            & (self.mz_origin == other.mz_origin)
+        )
 
     def __ne__(self, other: MasterPeakT) -> bool:  # type: ignore
         """
-        Reports true if any member variable differs between the two master peaks!
+        Reports true if counts, mz, borders or origin differ between the two master peaks.
 
         :param other: the other master peak object to compare this object with
-        :return: whether or not the two objects are equal
+        :return: whether or not the two objects are not equal
         """
-        if self.__dict__ != other.__dict__:
-            if (
-                (self.counts == other.counts)
-                & (self.mz == other.mz)
-                & (self.left == other.left)
-                & (self.right == other.right)
-                & (self.mz_origin == other.mz_origin)
-            ):
-                return False
-            else:
-                return True
-        else:
-            return True  # TODO check if this is really true, dicts equal means the objects should be equal
+        return not self.__eq__(other)
 
     def __str__(self) -> str:
         """
@@ -238,23 +238,29 @@ class MasterSpectrum:
             self.add(peak, charge)
 
     def load_from_tims(
-        self, intensities: list[int], mzs: list[float], ignore_charges: bool, delta_func: Callable | None = None
+        self,
+        intensities: list[int],
+        mzs: list[float],
+        ignore_charges: bool,
+        delta_func: Callable | None = None,
+        charges: list[int] | None = None,
     ):
         """
         Load data from tims and create master spectrum.
 
         :param intensities: list of intensities of peaks of individual spectra to sum
         :param mzs: list of mzs of peaks of individual spectra to sum
-        :param ignore_charges: whether to ignore charges when summing up peaks
+        :param ignore_charges: whether to ignore charges when summing up peaks. If False, peaks are only summed up
+            with peaks of the same charge and the master peaks are stored separately per charge in spectrum.
         :param delta_func: a callable to calculate the mass tolerance window
-        :raises NotImplementedError: If ignore_charges is set to False
+        :param charges: list of charges of peaks of individual spectra to sum, required if ignore_charges is False
+        :raises ValueError: If ignore_charges is set to False and no charges are given
         """
+        if not ignore_charges and charges is None:
+            raise ValueError("Adding up intensities by charge requires the charges of the peaks.")
         rel_int = _calculate_relative_intensity(intensities)
         if delta_func is None:
             delta_func = _calculate_delta_by_ppm(40)
-        for m, i in zip(mzs, rel_int, strict=False):
+        for idx, (m, i) in enumerate(zip(mzs, rel_int, strict=False)):
             p = Peak(float(m), float(i), delta_func)
-            if ignore_charges:
-                self.add(p, 0)
-            else:
-                raise NotImplementedError("Adding up intensities using precursor charge is not supported.")
+            self.add(p, 0 if ignore_charges else int(charges[idx]))  # type: ignore[index]
@@ -1,9 +1,20 @@
 """Initialize logger."""
 
 import logging
+from typing import TYPE_CHECKING
 
-from . import csv, hdf5, parquet
+from .._lazy import attach
 
-__all__ = ["csv", "hdf5", "parquet"]
+if TYPE_CHECKING:
+    from . import csv, feather, hdf5, parquet
+    from .table import TableFile, open_table, register_format
+
+__getattr__, __dir__ = attach(
+    __name__,
+    submodules=["csv", "feather", "hdf5", "parquet"],
+    attributes={"TableFile": "table", "open_table": "table", "register_format": "table"},
+)
+
+__all__ = ["csv", "feather", "hdf5", "parquet", "TableFile", "open_table", "register_format"]
 
 logger = logging.getLogger(__name__)
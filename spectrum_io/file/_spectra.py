@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+SPECTRUM_COLUMNS = ["MZ", "INTENSITIES"]
+
+
+def _flatten_list_column(column: pa.ChunkedArray) -> tuple[np.ndarray, np.ndarray]:
+    array = column.combine_chunks()
+    if not pa.types.is_large_list(array.type):
+        array = array.cast(pa.large_list(array.type.value_type))
+    offsets = array.offsets.to_numpy()
+    values = array.flatten().to_numpy(zero_copy_only=False)
+    return values, offsets - offsets[0]
+
+
+def spectra_to_table(metadata: pd.DataFrame, mzs: np.ndarray, intensities: np.ndarray, offsets: np.ndarray) -> pa.Table:
+    """
+    Wrap spectra given as flat numpy buffers into an Arrow table with large_list columns MZ and INTENSITIES.
+
+    :param metadata: Metadata with one row per spectrum
+    :param mzs: Flat array containing the mz values of all peaks
+    :param intensities: Flat array containing the intensities of all peaks
+    :param offsets: Array of length len(metadata) + 1 with the start of each spectrum in the flat arrays
+    :raises ValueError: if the lengths of metadata, offsets and flat arrays do not match
+    :return: the Arrow table, sharing the memory of mzs and intensities
+    """
+    offsets = np.asarray(offsets, dtype=np.int64)
+    if len(offsets) != len(metadata) + 1:
+        raise ValueError(f"Expected {len(metadata) + 1} offsets for {len(metadata)} spectra, got {len(offsets)}.")
+    if not len(mzs) == len(intensities) == offsets[-1]:
+        raise ValueError("mzs and intensities must both contain exactly offsets[-1] peaks.")
+    arrow_offsets = pa.array(offsets)
+    table = pa.Table.from_pandas(metadata, preserve_index=False)
+    table = table.append_column("MZ", pa.LargeListArray.from_arrays(arrow_offsets, pa.array(mzs)))
+    return table.append_column("INTENSITIES", pa.LargeListArray.from_arrays(arrow_offsets, pa.array(intensities)))
+
+
+def spectra_from_table(table: pa.Table) -> tuple[pd.DataFrame, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Split an Arrow table with list columns MZ and INTENSITIES into metadata and flat numpy buffers.
+
+    :param table: the Arrow table containing the spectra
+    :raises ValueError: if MZ and INTENSITIES do not contain the same number of peaks per spectrum
+    :return: a tuple of the metadata as a Pandas DataFrame, the flat mz values, the flat intensity values and the
+        offsets of the individual spectra
+    """
+    mzs, mz_offsets = _flatten_list_column(table.column("MZ"))
+    intensities, intensity_offsets = _flatten_list_column(table.column("INTENSITIES"))
+    if not np.array_equal(mz_offsets, intensity_offsets):
+        raise ValueError("MZ and INTENSITIES must contain the same number of peaks for every spectrum.")
+    metadata = table.drop_columns(SPECTRUM_COLUMNS).to_pandas()
+    return metadata, mzs, intensities, mz_offsets
@@ -1,24 +1,86 @@
+from collections.abc import Iterator
 from pathlib import Path
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
 
+from ..config import get_config
 
-def read_file(path: str | Path) -> pd.DataFrame:
+ENGINES = ["pyarrow", "c"]
+# number of rows parsed to estimate the memory usage of a row
+SAMPLE_ROWS = 1_000
+
+
+def _check_engine(engine: str):
+    if engine not in ENGINES:
+        raise ValueError(f"Engine {engine} not supported. Choose one of {ENGINES}.")
+
+
+def read_file(
+    path: str | Path,
+    usecols: list[str] | None = None,
+    dtype: dict[str, str | type] | None = None,
+    engine: str = "c",
+) -> pd.DataFrame:
     """
     Read csv file and return df with contents.
 
+    Columns that are not listed in usecols are skipped while parsing, and dtype enforces the type of the given
+    columns instead of inferring it. Entries in dtype for columns that are not present in the file are ignored.
+    By default, the file is parsed using pandas' parser. Parsing with pyarrow's multithreaded reader is faster for
+    large files, but columns read as str lose missing values, which become the string 'None', and are converted
+    from the inferred type, e.g. '007' becomes '7'.
+
     :param path: path to file to read
+    :param usecols: optional list of columns to read. If None, all columns are read.
+    :param dtype: optional mapping of column names to the dtype they are read as
+    :param engine: the parser to use, either "pyarrow" (multithreaded) or "c" (pandas' default parser)
     :return: df with contents as pd.DataFrame
     """
-    df = pd.read_csv(path, sep=",")
+    _check_engine(engine)
+    df = pd.read_csv(path, sep=",", usecols=usecols, dtype=dtype, engine=engine)
     return df
 
 
-def write_file(df: pd.DataFrame, path: str | Path):
+def iter_file(
+    path: str | Path,
+    chunksize: int | None = None,
+    usecols: list[str] | None = None,
+    dtype: dict[str, str | type] | None = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Lazily read csv file in chunks of rows.
+
+    :param path: path to file to read
+    :param chunksize: maximum number of rows per yielded chunk. If None, it is chosen such that a chunk fits into
+        the max_batch_bytes of the configuration, based on the memory usage of the first rows of the file.
+    :param usecols: optional list of columns to read. If None, all columns are read.
+    :param dtype: optional mapping of column names to the dtype they are read as
+    :yield: df with the contents of consecutive chunks of the file as pd.DataFrame
+    """
+    if chunksize is None:
+        sample = pd.read_csv(path, sep=",", usecols=usecols, dtype=dtype, nrows=SAMPLE_ROWS)
+        chunksize = get_config().batch_rows(sample.memory_usage(deep=True).sum() / max(len(sample), 1))
+    with pd.read_csv(path, sep=",", usecols=usecols, dtype=dtype, chunksize=chunksize) as reader:
+        yield from reader
+
+
+def write_file(df: pd.DataFrame, path: str | Path, engine: str = "c"):
     """
     Write dataframe to csv file.
 
+    By default, the file is written using pandas' csv writer. Writing with pyarrow's csv writer is considerably
+    faster for large tables, but formats the output differently, e.g. booleans as true / false and floats with
+    a different precision, and fails for columns of lists or other Python objects.
+
     :param df: df with contents as pd.DataFrame
     :param path: path to file to write
+    :param engine: the writer to use, either "pyarrow" or "c" (pandas' default writer)
     """
-    df.to_csv(path, index=False)
+    _check_engine(engine)
+    if engine == "pyarrow":
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        pa_csv.write_csv(table, path, write_options=pa_csv.WriteOptions(quoting_style="needed"))
+    else:
+        df.to_csv(path, index=False)
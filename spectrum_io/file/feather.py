@@ -0,0 +1,112 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+from ._spectra import SPECTRUM_COLUMNS, spectra_from_table, spectra_to_table
+
+Pathlike = Path | str
+
+
+def read_table(path: Pathlike, columns: list[str] | None = None, memory_map: bool = True) -> pa.Table:
+    """
+    Read a Feather (Arrow IPC) file into an Arrow table.
+
+    By default, the file is memory-mapped instead of read into memory. For uncompressed files, the returned table
+    references the mapped pages directly, so opening even multi-GB files is instant, only the accessed parts are
+    loaded from disk, and several processes reading the same file share its pages through the OS page cache.
+
+    :param path: Path to the Feather file to read
+    :param columns: Optional list of columns to read. If None, all columns are read.
+    :param memory_map: Whether to memory-map the file. If False, the file is read into memory.
+    :return: an Arrow table with the contents of the file
+    """
+    source = pa.memory_map(str(path)) if memory_map else pa.OSFile(str(path))
+    with source:
+        table = ipc.open_file(source).read_all()
+    return table if columns is None else table.select(columns)
+
+
+def read_file(path: Pathlike, columns: list[str] | None = None, memory_map: bool = True) -> pd.DataFrame:
+    """
+    Read a Feather (Arrow IPC) file and return a Pandas DataFrame with its contents.
+
+    :param path: Path to the Feather file to read
+    :param columns: Optional list of columns to read. If None, all columns are read.
+    :param memory_map: Whether to memory-map the file, see :func:`read_table`
+    :return: a Pandas DataFrame with the contents of the file
+    """
+    return read_table(path, columns=columns, memory_map=memory_map).to_pandas()
+
+
+def read_spectra(
+    path: Pathlike, columns: list[str] | None = None
+) -> tuple[pd.DataFrame, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Read spectra from a Feather (Arrow IPC) file into flat numpy buffers.
+
+    The file is memory-mapped, so for files written with :func:`write_spectra` the returned mz and intensity
+    buffers are read-only views of the mapped file and no peak data is copied.
+
+    :param path: Path to the Feather file to read
+    :param columns: Optional list of metadata columns to read. If None, all columns are read.
+    :return: a tuple of the metadata as a Pandas DataFrame, the flat mz values, the flat intensity values and the
+        offsets of the individual spectra
+    """
+    if columns is not None:
+        columns = [column for column in columns if column not in SPECTRUM_COLUMNS] + SPECTRUM_COLUMNS
+    return spectra_from_table(read_table(path, columns=columns))
+
+
+def write_table(table: pa.Table, path: Pathlike, compression: str | None = None) -> None:
+    """
+    Write an Arrow table to a Feather (Arrow IPC) file.
+
+    :param table: Data to store
+    :param path: Path to write the Feather file to
+    :param compression: Optional buffer compression, either 'lz4' or 'zstd'. If None, the file is written
+        uncompressed, which is required for zero-copy memory-mapped reads.
+    """
+    options = ipc.IpcWriteOptions(compression=compression)
+    with ipc.new_file(str(path), table.schema, options=options) as writer:
+        writer.write_table(table)
+
+
+def write_file(
+    data: pd.DataFrame, path: Pathlike, schema: pa.Schema | None = None, compression: str | None = None
+) -> None:
+    """
+    Write a single DataFrame to a Feather (Arrow IPC) file.
+
+    :param data: Data to store
+    :param path: Path to write the Feather file to
+    :param schema: Optional Arrow schema the data is converted to. If None, the schema is inferred from the data.
+    :param compression: Optional buffer compression, see :func:`write_table`
+    """
+    write_table(pa.Table.from_pandas(data, schema=schema, preserve_index=False), path, compression=compression)
+
+
+def write_spectra(
+    metadata: pd.DataFrame,
+    mzs: np.ndarray,
+    intensities: np.ndarray,
+    offsets: np.ndarray,
+    path: Pathlike,
+    compression: str | None = None,
+) -> None:
+    """
+    Write spectra given as flat numpy buffers to a Feather (Arrow IPC) file.
+
+    The peaks of the i-th spectrum are found at mzs[offsets[i]:offsets[i + 1]]. See
+    :func:`spectrum_io.file.parquet.write_spectra` for details.
+
+    :param metadata: Metadata with one row per spectrum
+    :param mzs: Flat array containing the mz values of all peaks
+    :param intensities: Flat array containing the intensities of all peaks
+    :param offsets: Array of length len(metadata) + 1 with the start of each spectrum in the flat arrays
+    :param path: Path to write the Feather file to
+    :param compression: Optional buffer compression, see :func:`write_table`
+    """
+    write_table(spectra_to_table(metadata, mzs, intensities, offsets), path, compression=compression)
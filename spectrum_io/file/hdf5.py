@@ -1,8 +1,10 @@
+import json
 import logging
 import threading
 from pathlib import Path
 
 import h5py
+import numpy as np
 import pandas as pd
 import scipy
 from scipy.sparse import coo_matrix
@@ -13,6 +15,8 @@ META_DATA_KEY = "meta_data"
 INTENSITY_RAW_KEY = "raw_intensity"
 INTENSITY_PRED_KEY = "pred_intensity"
 MZ_RAW_KEY = "raw_mz"
+SUMMARY_ATTR = "spectrum_io_summary"
+CATALOG_COLUMNS = ["key", "kind", "n_rows", "n_columns", "nnz", "columns", "dtypes"]
 
 
 def read_file(path: str | Path, key: str) -> pd.DataFrame:
@@ -45,6 +49,107 @@ def read_file(path: str | Path, key: str) -> pd.DataFrame:
         logger.exception(e)
 
 
+def _summarize_dataframe(data: pd.DataFrame) -> dict:
+    return {
+        "kind": "frame",
+        "n_rows": len(data),
+        "n_columns": len(data.columns),
+        "nnz": None,
+        "columns": [str(column) for column in data.columns],
+        "dtypes": {str(column): str(dtype) for column, dtype in data.dtypes.items()},
+    }
+
+
+def _summarize_sparse(
+    data: scipy.sparse.spmatrix, nnz: int, column_names: list[str] | None, values_dtype: np.dtype
+) -> dict:
+    return {
+        "kind": "sparse",
+        "n_rows": data.shape[0],
+        "n_columns": data.shape[1],
+        "nnz": nnz,
+        "columns": [str(column) for column in column_names] if column_names else None,
+        "dtypes": {"values": str(values_dtype)},
+    }
+
+
+def _infer_summary(obj: h5py.Group | h5py.Dataset) -> dict:
+    """Infer the summary of a dataset written without summary attribute, touching only small metadata arrays."""
+    summary: dict = {"kind": "unknown", "n_rows": None, "n_columns": None, "nnz": None, "columns": None, "dtypes": None}
+    if isinstance(obj, h5py.Dataset):
+        summary.update(kind="array", n_rows=obj.shape[0] if obj.shape else None, dtypes={"values": str(obj.dtype)})
+        if len(obj.shape) > 1:
+            summary["n_columns"] = obj.shape[1]
+        return summary
+    pandas_type = obj.attrs.get("pandas_type", b"")
+    pandas_type = pandas_type.decode() if isinstance(pandas_type, bytes) else str(pandas_type)
+    if pandas_type == "frame":
+        columns = [c.decode() if isinstance(c, bytes) else str(c) for c in obj["axis0"][()]]
+        dtypes = {}
+        for i in range(int(obj.attrs["nblocks"])):
+            items = [c.decode() if isinstance(c, bytes) else str(c) for c in obj[f"block{i}_items"][()]]
+            dtypes.update({item: str(obj[f"block{i}_values"].dtype) for item in items})
+        summary.update(
+            kind="frame", n_rows=obj["axis1"].shape[0], n_columns=len(columns), columns=columns, dtypes=dtypes
+        )
+    elif pandas_type == "frame_table":
+        summary.update(kind="frame_table", n_rows=obj["table"].shape[0])
+    elif "values" in obj and "shape" in obj:
+        n_rows, n_columns = (int(x) for x in obj["shape"][()])
+        columns = obj["column_names"].asstr()[()].tolist() if "column_names" in obj else None
+        summary.update(
+            kind="sparse",
+            n_rows=n_rows,
+            n_columns=n_columns,
+            nnz=obj["values"].shape[0],
+            columns=columns,
+            dtypes={"values": str(obj["values"].dtype)},
+        )
+    return summary
+
+
+def list_datasets(path: str | Path) -> list[str]:
+    """
+    List the keys of all datasets in an hdf5 file that can be passed to :func:`read_file`.
+
+    :param path: The path to the hdf5 file
+    :return: a list of dataset keys
+    """
+    with h5py.File(path, "r") as f:
+        return list(f.keys())
+
+
+def read_summary(path: str | Path, key: str) -> dict:
+    """
+    Read the summary of a single dataset in an hdf5 file without reading its data.
+
+    The summary is taken from the attribute stored by :func:`write_dataset`. For datasets written otherwise, it is
+    inferred from hdf5 metadata, in which case only the information that is cheaply available is filled in.
+
+    :param path: The path to the hdf5 file
+    :param key: The key of the dataset/group of interest
+    :return: a dictionary with the entries kind, n_rows, n_columns, nnz (sparse matrices only), columns and dtypes
+    """
+    with h5py.File(path, "r") as f:
+        obj = f[key]
+        if SUMMARY_ATTR in obj.attrs:
+            return json.loads(obj.attrs[SUMMARY_ATTR])
+        return _infer_summary(obj)
+
+
+def read_catalog(path: str | Path) -> pd.DataFrame:
+    """
+    Create a catalog of all datasets in an hdf5 file, reading metadata only.
+
+    This can be used to plan reads (e.g. chunk sizes) without opening the data of any dataset.
+
+    :param path: The path to the hdf5 file
+    :return: a DataFrame with one row per dataset and the columns key, kind, n_rows, n_columns, nnz, columns, dtypes
+    """
+    catalog = [{"key": key, **read_summary(path, key)} for key in list_datasets(path)]
+    return pd.DataFrame(catalog, columns=CATALOG_COLUMNS)
+
+
 def thread_this(fn):
     """Function for threading."""
 
@@ -97,6 +202,9 @@ def write_dataset(
     """
     Writes or appends dataset to an hdf5 file.
 
+    Alongside the data, a summary of the dataset (row and column counts, column names and dtypes) is stored as
+    an attribute, which can be retrieved using :func:`read_summary` or :func:`read_catalog` without reading the data.
+
     :param data: The data to store. Can be a pandas DataFrame or a scipy Sparsematrix
     :param path: The path to store the file to
     :param dataset_name: The key in the hdf5 file under which to store the data
@@ -120,6 +228,8 @@ def write_dataset(
     try:
         if isinstance(data, pd.DataFrame):
             data.to_hdf(path, key=dataset_name, mode=mode, complib=compression)
+            with h5py.File(path, "a") as f:
+                f[dataset_name].attrs[SUMMARY_ATTR] = json.dumps(_summarize_dataframe(data))
         elif isinstance(data, scipy.sparse.spmatrix):
             with h5py.File(path, mode) as f:
                 group_name = f"sparse_{dataset_name}"
@@ -134,6 +244,9 @@ def write_dataset(
                     f.create_dataset(f"{group_name}/column_names", data=column_names, compression=compression)
                 if index:
                     f.create_dataset(f"{group_name}/index", data=index, compression=compression)
+                f[group_name].attrs[SUMMARY_ATTR] = json.dumps(
+                    _summarize_sparse(data, len(values), column_names, f[f"{group_name}/values"].dtype)
+                )
         else:
             raise AssertionError("Only pd.DataFrame and scipy.sparse.spmatrix are supported." + type(data))
         logger.info(f"Data {'appended' if mode == 'a' else 'written'} to {path}")
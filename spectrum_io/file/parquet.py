@@ -1,79 +1,296 @@
 import logging
+import shutil
+from collections.abc import Iterable, Iterator
 from pathlib import Path
+from typing import Any
+from urllib.parse import quote
 
+import numpy as np
 import pandas as pd
 import pyarrow as pa
+import pyarrow.dataset as ds
 import pyarrow.parquet as pq
 
+from ..config import get_config
+from ._spectra import SPECTRUM_COLUMNS, spectra_from_table, spectra_to_table
+
 Pathlike = Path | str
+Filters = list[tuple[str, str, Any]] | list[list[tuple[str, str, Any]]]
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_BATCH_SIZE = 131_072
+# number of batches the scanner decodes ahead of the one being consumed
+BATCH_READAHEAD = 2
+PARTITION_KEY = "dataset"
+PARTITIONING = ds.HivePartitioning.discover(schema=pa.schema([(PARTITION_KEY, pa.dictionary(pa.int32(), pa.string()))]))
+
 
-def read_file(path: Pathlike) -> pd.DataFrame:
+def read_file(path: Pathlike, columns: list[str] | None = None, filters: Filters | None = None) -> pd.DataFrame:
     """
     Read a Parquet file and return a Pandas DataFrame with its contents.
 
+    Columns that are not requested are never decoded, and row groups whose statistics cannot satisfy the
+    filters are skipped entirely, e.g. filters=[("RAW_FILE", "=", "run_1"), ("SCAN_NUMBER", "<", 10000)].
+
     :param path: Path to the Parquet file to read
+    :param columns: Optional list of columns to read. If None, all columns are read.
+    :param filters: Optional row filters in disjunctive normal form as accepted by pyarrow, i.e. a list of
+        (column, op, value) tuples that are combined with AND, or a list of such lists that are combined with OR
     :return: a Pandas DataFrame with the contents of the file
     """
-    return pd.read_parquet(path)
+    return pd.read_parquet(path, columns=columns, filters=filters)
+
+
+def _bytes_per_row(dataset: ds.Dataset, columns: list[str] | None) -> float | None:
+    """Estimate the decoded size of a row from the column chunk sizes stored in the metadata of the first file."""
+    for fragment in dataset.get_fragments():
+        metadata = fragment.metadata
+        if metadata.num_rows == 0:
+            continue
+        size = 0
+        for i in range(metadata.num_row_groups):
+            row_group = metadata.row_group(i)
+            for j in range(row_group.num_columns):
+                column = row_group.column(j)
+                if columns is None or column.path_in_schema.split(".")[0] in columns:
+                    size += column.total_uncompressed_size
+        return size / metadata.num_rows
+    return None
+
+
+def iter_batches(
+    path: Pathlike,
+    columns: list[str] | None = None,
+    filters: Filters | None = None,
+    batch_size: int | None = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Lazily read a Parquet file or dataset directory in batches.
+
+    The data is scanned using pyarrow.dataset, so only the requested columns and the row groups matching
+    the filters are read from disk. At most batch_size rows are held in memory per yielded DataFrame.
+
+    :param path: Path to the Parquet file or the root of a Parquet dataset to read
+    :param columns: Optional list of columns to read. If None, all columns are read.
+    :param filters: Optional row filters, see :func:`read_file` for the accepted format
+    :param batch_size: Maximum number of rows per yielded DataFrame. If None, it is chosen such that the batches
+        held in memory, including those decoded ahead, fit into the max_batch_bytes of the configuration.
+    :yield: Pandas DataFrames containing consecutive batches of the matching rows
+    """
+    dataset = ds.dataset(path, format="parquet")
+    if batch_size is None:
+        bytes_per_row = _bytes_per_row(dataset, columns)
+        if bytes_per_row is None:
+            batch_size = DEFAULT_BATCH_SIZE
+        else:
+            batch_size = get_config().batch_rows(bytes_per_row, in_flight=BATCH_READAHEAD + 1)
+    expression = pq.filters_to_expression(filters) if filters else None
+    for batch in dataset.to_batches(
+        columns=columns,
+        filter=expression,
+        batch_size=batch_size,
+        batch_readahead=BATCH_READAHEAD,
+        fragment_readahead=1,
+    ):
+        if batch.num_rows > 0:
+            yield batch.to_pandas()
+
+
+def _partition_path(path: Path, dataset_name: str) -> Path:
+    return path / f"{PARTITION_KEY}={quote(str(dataset_name), safe='')}"
 
 
 def read_partition(path: Pathlike, dataset_name: str) -> pd.DataFrame:
     """
     Read a single table from a partitioned dataset.
 
+    Only the directory of the requested partition is opened, so the cost of reading it does not depend on
+    the number of other partitions in the dataset.
+
     :param path: Root path of the partitioned dataset
     :param dataset_name: Name of the dataset to extract
-
+    :raises FileNotFoundError: if the partitioned dataset does not contain a dataset with the given name
     :return: a Pandas DataFrame of the specified table from the partitioned dataset
     """
-    try:
-        dataset = pq.ParquetDataset(path, filters=[("dataset", "=", dataset_name)])
-        df = dataset.read().to_pandas().drop("dataset", axis=1)
-    except pa.lib.ArrowNotImplementedError as e1:
-        if dataset_name.isdigit():
-            try:
-                logger.warning("Failed to read from partition using string of integer as key, trying with int...")
-                dataset = pq.ParquetDataset(path, filters=[("dataset", "=", int(dataset_name))])
-                df = dataset.read().to_pandas().drop("dataset", axis=1)
-            except pa.lib.ArrowNotImplementedError as e2:
-                logger.exception(e2)
-        else:
-            logger.exception(e1)
+    partition_path = _partition_path(Path(path), dataset_name)
+    if not partition_path.is_dir():
+        raise FileNotFoundError(f"Dataset {dataset_name} not found in partitioned dataset {path}.")
+    return ds.dataset(partition_path, format="parquet").to_table().to_pandas()
+
+
+def read_partitions(
+    path: Pathlike, dataset_names: list[str] | None = None, columns: list[str] | None = None
+) -> pd.DataFrame:
+    """
+    Read several tables from a partitioned dataset into a single DataFrame.
+
+    The partition key is read using the explicit :data:`PARTITIONING` schema, i.e. always as a dictionary-encoded
+    string, which is returned as a categorical column named 'dataset'. Partitions that are not requested are
+    pruned based on their directory name without opening any of their files.
+
+    :param path: Root path of the partitioned dataset
+    :param dataset_names: Optional names of the datasets to read. If None, all datasets are read.
+    :param columns: Optional list of columns to read. If None, all columns are read.
+    :return: a Pandas DataFrame of the specified tables with an additional 'dataset' column
+    """
+    dataset = ds.dataset(path, format="parquet", partitioning=PARTITIONING)
+    expression = None
+    if dataset_names is not None:
+        expression = ds.field(PARTITION_KEY).isin([str(name) for name in dataset_names])
+    if columns is not None and PARTITION_KEY not in columns:
+        columns = [*columns, PARTITION_KEY]
+    return dataset.to_table(columns=columns, filter=expression).to_pandas()
+
+
+def read_spectra(
+    path: Pathlike, columns: list[str] | None = None, filters: Filters | None = None
+) -> tuple[pd.DataFrame, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Read spectra from a Parquet file into flat numpy buffers.
 
-    return df
+    Instead of materializing one numpy array per spectrum, the MZ and INTENSITIES list columns are returned as
+    flat value buffers of all peaks together with a shared offsets array, such that the peaks of the i-th
+    spectrum are found at values[offsets[i]:offsets[i + 1]]. This works for files written with
+    :func:`write_spectra` as well as for list columns written by pandas.
 
+    :param path: Path to the Parquet file to read
+    :param columns: Optional list of metadata columns to read. If None, all columns are read.
+    :param filters: Optional row filters, see :func:`read_file` for the accepted format
+    :raises ValueError: if MZ and INTENSITIES do not contain the same number of peaks per spectrum
+    :return: a tuple of the metadata as a Pandas DataFrame, the flat mz values, the flat intensity values and the
+        offsets of the individual spectra
+    """
+    if columns is not None:
+        columns = [column for column in columns if column not in SPECTRUM_COLUMNS] + SPECTRUM_COLUMNS
+    return spectra_from_table(pq.read_table(path, columns=columns, filters=filters))
 
-def write_file(data: pd.DataFrame, path: Pathlike) -> None:
+
+def write_file(data: pd.DataFrame, path: Pathlike, schema: pa.Schema | None = None) -> None:
     """Writes a single DataFrame or matrix to a Parquet file.
 
     :param data: Data to store
     :param path: Path to write the Parquet file to
+    :param schema: Optional Arrow schema the data is converted to. If None, the schema is inferred from the data.
+    """
+    if schema is None:
+        data.to_parquet(path)
+    else:
+        pq.write_table(pa.Table.from_pandas(data, schema=schema, preserve_index=False), path)
+
+
+def write_spectra(
+    metadata: pd.DataFrame,
+    mzs: np.ndarray,
+    intensities: np.ndarray,
+    offsets: np.ndarray,
+    path: Pathlike,
+    row_group_size: int | None = None,
+) -> None:
+    """
+    Write spectra given as flat numpy buffers to a Parquet file.
+
+    The peaks of all spectra are passed as flat mz and intensity buffers, with the peaks of the i-th spectrum
+    found at mzs[offsets[i]:offsets[i + 1]]. The buffers are wrapped into large_list columns MZ and
+    INTENSITIES without copying or creating a Python object per spectrum.
+
+    :param metadata: Metadata with one row per spectrum
+    :param mzs: Flat array containing the mz values of all peaks
+    :param intensities: Flat array containing the intensities of all peaks
+    :param offsets: Array of length len(metadata) + 1 with the start of each spectrum in the flat arrays
+    :param path: Path to write the Parquet file to
+    :param row_group_size: Optional maximum number of rows per row group. If None, pyarrow's default is used.
+    :raises ValueError: if the lengths of metadata, offsets and flat arrays do not match
     """
-    data.to_parquet(path)
+    pq.write_table(spectra_to_table(metadata, mzs, intensities, offsets), path, row_group_size=row_group_size)
 
 
-def write_partition(datasets: list[pd.DataFrame], path: Pathlike, dataset_names: list[str]) -> None:
+class PartitionWriter:
+    """
+    Incrementally write datasets to a Parquet dataset partitioned by dataset name.
+
+    Each dataset is converted and written to its own partition directory as soon as it is passed to
+    :meth:`write`, so at no point more than a single dataset needs to be held in memory. Writing the same
+    dataset name repeatedly appends further row groups to that partition until the writer is closed.
+    Existing partitions with a name that is written to are replaced, all other partitions are kept.
+    """
+
+    def __init__(self, path: Pathlike, row_group_size: int | None = None):
+        """
+        Initialize a PartitionWriter.
+
+        :param path: Root path to write the partitioned dataset to
+        :param row_group_size: Optional maximum number of rows per row group. If None, pyarrow's default is used.
+        """
+        if isinstance(path, str):
+            path = Path(path)
+        self.path = path
+        self.row_group_size = row_group_size
+        self._writers: dict[str, pq.ParquetWriter] = {}
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    def partition_path(self, dataset_name: str) -> Path:
+        """
+        Get the directory of the partition storing the given dataset.
+
+        :param dataset_name: Name of the dataset
+        :return: Path to the hive-style partition directory
+        """
+        return _partition_path(self.path, dataset_name)
+
+    def write(self, data: pd.DataFrame, dataset_name: str) -> None:
+        """
+        Write a dataset (or a chunk of it) to its partition.
+
+        :param data: Data to store
+        :param dataset_name: Name to assign to the dataset for retrieval
+        """
+        table = pa.Table.from_pandas(data)
+        writer = self._writers.get(dataset_name)
+        if writer is None:
+            partition_path = self.partition_path(dataset_name)
+            if partition_path.exists():
+                shutil.rmtree(partition_path)
+            partition_path.mkdir()
+            writer = pq.ParquetWriter(partition_path / "part-0.parquet", table.schema)
+            self._writers[dataset_name] = writer
+        else:
+            table = table.cast(writer.schema)
+        writer.write_table(table, row_group_size=self.row_group_size)
+
+    def close(self) -> None:
+        """Finalize all partition files."""
+        for writer in self._writers.values():
+            writer.close()
+        self._writers.clear()
+
+    def __enter__(self) -> "PartitionWriter":
+        """Enter the runtime context of the writer."""
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Close the writer when leaving the runtime context."""
+        self.close()
+
+
+def write_partition(
+    datasets: Iterable[pd.DataFrame],
+    path: Pathlike,
+    dataset_names: Iterable[str],
+    row_group_size: int | None = None,
+) -> None:
     """
     Write several datasets to a Parquet dataset as a directory containing subdirectories partitioned by dataset name.
 
+    Datasets are written one at a time, so they can be passed as a generator to avoid keeping all of them
+    in memory simultaneously. The partitions follow the :data:`PARTITIONING` schema, i.e. dataset names are
+    always read back as strings, even if all of them are strings of ints.
+
     :param datasets: Datasets to write
     :param path: Root path to write the partitioned dataset to
-    :param dataset_names: Names to assign to the datasets for retrieval. Careful: If all of these are strings of ints,
-        Parquet will convert them to raw integers!
-    """
-    df = pd.concat([dataset.assign(dataset=name) for dataset, name in zip(datasets, dataset_names, strict=False)])
-    table = pa.Table.from_pandas(df)
-
-    if isinstance(path, str):
-        path = Path(path)
-    path.mkdir(exist_ok=True)
-
-    pq.write_to_dataset(
-        table,
-        root_path=path,
-        partition_cols=["dataset"],
-        existing_data_behavior="delete_matching",
-    )
+    :param dataset_names: Names to assign to the datasets for retrieval
+    :param row_group_size: Optional maximum number of rows per row group. If None, pyarrow's default is used.
+    """
+    with PartitionWriter(path, row_group_size=row_group_size) as writer:
+        for dataset, name in zip(datasets, dataset_names, strict=False):
+            writer.write(dataset, name)
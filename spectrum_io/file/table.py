@@ -0,0 +1,433 @@
+import logging
+import os
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import IO
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+from ..config import get_config
+from . import csv, feather, parquet
+
+Pathlike = Path | str
+
+logger = logging.getLogger(__name__)
+
+MODES = ["r", "w", "a"]
+
+_FORMATS: dict[str, type["TableFile"]] = {}
+
+
+def register_format(*suffixes: str) -> Callable[[type["TableFile"]], type["TableFile"]]:
+    """
+    Register a TableFile backend for the given file suffixes.
+
+    :param suffixes: file suffixes including the leading dot, e.g. ".csv"
+    :return: a class decorator registering the decorated TableFile subclass
+    """
+
+    def decorator(cls: type["TableFile"]) -> type["TableFile"]:
+        for suffix in suffixes:
+            _FORMATS[suffix.lower()] = cls
+        return cls
+
+    return decorator
+
+
+def open_table(path: Pathlike, mode: str = "r", **kwargs) -> "TableFile":
+    """
+    Open a table file using the backend registered for the suffix of the path.
+
+    All backends share the same interface for reading (optionally restricted to a subset of columns),
+    streaming batches and writing / appending DataFrames, so callers can switch between file formats
+    by changing the file suffix only.
+
+    :param path: path to the table file
+    :param mode: 'r' to read, 'w' to (over)write, discarding an existing table when opened, or 'a' to append to an
+        existing file
+    :param kwargs: additional backend-specific keyword arguments, e.g. key for hdf5 files or engine for csv files
+    :raises ValueError: if mode is not supported or no backend is registered for the suffix of the path
+    :return: the opened table file, which can be used as a context manager
+    """
+    if mode not in MODES:
+        raise ValueError(f"Mode {mode} not supported. Choose one of {MODES}.")
+    path = Path(path)
+    backend = _FORMATS.get(path.suffix.lower())
+    if backend is None:
+        raise ValueError(f"No table format registered for suffix '{path.suffix}'. Supported: {sorted(_FORMATS)}.")
+    return backend(path, mode, **kwargs)
+
+
+def registered_suffixes(backend: type["TableFile"]) -> list[str]:
+    """
+    Get the file suffixes registered for a TableFile backend.
+
+    :param backend: the TableFile subclass
+    :return: the suffixes including the leading dot, in the order of registration
+    """
+    return [suffix for suffix, cls in _FORMATS.items() if cls is backend]
+
+
+class TableFile(ABC):
+    """
+    Common interface for tabular files.
+
+    Data written in mode 'w' or 'a' is appended batch by batch with every call of :meth:`write` and is
+    finalized with :meth:`close`, which is called automatically when used as a context manager. Opening a
+    table in mode 'w' discards an existing table right away, even if nothing is written afterwards.
+    """
+
+    def __init__(self, path: Path, mode: str = "r"):
+        """
+        Initialize a TableFile.
+
+        :param path: path to the table file
+        :param mode: 'r' to read, 'w' to (over)write or 'a' to append to an existing file
+        """
+        self.path = path
+        self.mode = mode
+
+    @abstractmethod
+    def read(self, columns: list[str] | None = None) -> pd.DataFrame:
+        """
+        Read the whole table.
+
+        :param columns: optional list of columns to read. If None, all columns are read.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def iter_batches(self, batch_size: int | None = None, columns: list[str] | None = None):
+        """
+        Lazily read the table in batches of at most batch_size rows.
+
+        :param batch_size: maximum number of rows per batch. If None, it is chosen such that a batch fits into the
+            max_batch_bytes of the configuration.
+        :param columns: optional list of columns to read. If None, all columns are read.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def write(self, data: pd.DataFrame):
+        """
+        Write a batch of rows to the table.
+
+        :param data: the rows to write
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def close(self):
+        """Finalize the table file."""
+        raise NotImplementedError
+
+    def _check_writable(self):
+        if self.mode == "r":
+            raise ValueError(f"{self.path} was opened for reading only.")
+
+    def __enter__(self) -> "TableFile":
+        """Enter the runtime context of the table file."""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Close the table file when leaving the runtime context."""
+        self.close()
+
+
+@register_format(".csv")
+class CsvTable(TableFile):
+    """
+    Table file backend for comma-separated files.
+
+    Batches are written with the writer selected by engine, see :func:`spectrum_io.file.csv.write_file`, so that
+    the output is the same as writing the concatenated batches at once.
+    """
+
+    def __init__(self, path: Path, mode: str = "r", engine: str = "c"):
+        """
+        Initialize a CsvTable.
+
+        :param path: path to the table file
+        :param mode: 'r' to read, 'w' to (over)write or 'a' to append to an existing file
+        :param engine: the writer to use, either "pyarrow" or "c" (pandas' default writer)
+        """
+        csv._check_engine(engine)
+        super().__init__(path, mode)
+        self.engine = engine
+        self._handle: IO | None = None
+        self._write_header = mode == "w" or not path.is_file() or path.stat().st_size == 0
+        if mode == "w":
+            self._open_handle()
+
+    def _open_handle(self):
+        # pyarrow writes bytes, pandas writes text with its own line terminators
+        mode = "w" if self.mode == "w" else "a"
+        if self.engine == "pyarrow":
+            self._handle = open(self.path, f"{mode}b")
+        else:
+            self._handle = open(self.path, mode, newline="")
+
+    def read(self, columns: list[str] | None = None) -> pd.DataFrame:
+        """
+        Read the whole table.
+
+        :param columns: optional list of columns to read. If None, all columns are read.
+        :return: the table as pd.DataFrame
+        """
+        return csv.read_file(self.path, usecols=columns)
+
+    def iter_batches(self, batch_size: int | None = None, columns: list[str] | None = None):
+        """
+        Lazily read the table in batches of at most batch_size rows.
+
+        :param batch_size: maximum number of rows per batch. If None, it is chosen such that a batch fits into the
+            max_batch_bytes of the configuration.
+        :param columns: optional list of columns to read. If None, all columns are read.
+        :return: an iterator over the batches as pd.DataFrame
+        """
+        return csv.iter_file(self.path, chunksize=batch_size, usecols=columns)
+
+    def write(self, data: pd.DataFrame):
+        """
+        Write a batch of rows to the table.
+
+        :param data: the rows to write
+        """
+        self._check_writable()
+        if self._handle is None:
+            self._open_handle()
+        if self.engine == "pyarrow":
+            write_options = pa_csv.WriteOptions(include_header=self._write_header, quoting_style="needed")
+            table = pa.Table.from_pandas(data, preserve_index=False)
+            pa_csv.write_csv(table, self._handle, write_options=write_options)
+        else:
+            data.to_csv(self._handle, header=self._write_header, index=False)
+        self._write_header = False
+
+    def close(self):
+        """Finalize the table file."""
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+
+class _ArrowTable(TableFile):
+    """
+    Base class for Arrow-based backends that write through a single open writer.
+
+    Since Parquet and Arrow IPC files cannot be extended in place, appending to an existing file writes its
+    batches to a temporary file first, followed by the new data, and replaces the original file on close.
+    The writer is only opened with the schema of the first batch, so opening in mode 'w' removes an existing file.
+    """
+
+    def __init__(self, path: Path, mode: str = "r"):
+        super().__init__(path, mode)
+        if mode == "w":
+            path.unlink(missing_ok=True)
+        self._writer: pq.ParquetWriter | ipc.RecordBatchFileWriter | None = None
+        self._schema: pa.Schema | None = None
+        self._target = path
+        if mode == "a" and path.is_file():
+            self._target = path.with_name(f".{path.name}.tmp")
+
+    @abstractmethod
+    def _open_writer(self, schema: pa.Schema) -> pq.ParquetWriter | ipc.RecordBatchFileWriter:
+        raise NotImplementedError
+
+    def _write_table(self, table: pa.Table):
+        if self._writer is None:
+            self._schema = table.schema
+            self._writer = self._open_writer(self._schema)
+            if self._target != self.path:
+                for batch in self.iter_batches():
+                    self._write_table(pa.Table.from_pandas(batch, preserve_index=False))
+        else:
+            table = table.cast(self._schema)
+        self._writer.write_table(table, **self._write_kwargs())
+
+    def _write_kwargs(self) -> dict:
+        return {}
+
+    def write(self, data: pd.DataFrame):
+        """
+        Write a batch of rows to the table.
+
+        :param data: the rows to write
+        """
+        self._check_writable()
+        self._write_table(pa.Table.from_pandas(data, preserve_index=False))
+
+    def close(self):
+        """Finalize the table file."""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+            if self._target != self.path:
+                os.replace(self._target, self.path)
+                self._target = self.path
+
+
+@register_format(".parquet", ".pq")
+class ParquetTable(_ArrowTable):
+    """Table file backend for Parquet files."""
+
+    def __init__(self, path: Path, mode: str = "r", row_group_size: int | None = None):
+        """
+        Initialize a ParquetTable.
+
+        :param path: path to the table file
+        :param mode: 'r' to read, 'w' to (over)write or 'a' to append to an existing file
+        :param row_group_size: optional maximum number of rows per row group. If None, pyarrow's default is used.
+        """
+        super().__init__(path, mode)
+        self.row_group_size = row_group_size
+
+    def read(self, columns: list[str] | None = None) -> pd.DataFrame:
+        """
+        Read the whole table.
+
+        :param columns: optional list of columns to read. If None, all columns are read.
+        :return: the table as pd.DataFrame
+        """
+        return parquet.read_file(self.path, columns=columns)
+
+    def iter_batches(self, batch_size: int | None = None, columns: list[str] | None = None):
+        """
+        Lazily read the table in batches of at most batch_size rows.
+
+        :param batch_size: maximum number of rows per batch. If None, it is chosen such that a batch fits into the
+            max_batch_bytes of the configuration.
+        :param columns: optional list of columns to read. If None, all columns are read.
+        :return: an iterator over the batches as pd.DataFrame
+        """
+        return parquet.iter_batches(self.path, columns=columns, batch_size=batch_size)
+
+    def _open_writer(self, schema: pa.Schema) -> pq.ParquetWriter:
+        return pq.ParquetWriter(self._target, schema)
+
+    def _write_kwargs(self) -> dict:
+        return {"row_group_size": self.row_group_size}
+
+
+@register_format(".feather", ".arrow", ".ipc")
+class FeatherTable(_ArrowTable):
+    """Table file backend for Feather (Arrow IPC) files."""
+
+    def read(self, columns: list[str] | None = None) -> pd.DataFrame:
+        """
+        Read the whole table.
+
+        :param columns: optional list of columns to read. If None, all columns are read.
+        :return: the table as pd.DataFrame
+        """
+        return feather.read_file(self.path, columns=columns)
+
+    def iter_batches(self, batch_size: int | None = None, columns: list[str] | None = None):
+        """
+        Lazily read the table in batches of at most batch_size rows.
+
+        :param batch_size: maximum number of rows per batch. If None, it is chosen such that a batch fits into the
+            max_batch_bytes of the configuration.
+        :param columns: optional list of columns to read. If None, all columns are read.
+        :return: an iterator over the batches as pd.DataFrame
+        """
+        return self._iter_batches(batch_size, columns)
+
+    def _iter_batches(self, batch_size: int | None, columns: list[str] | None) -> Iterator[pd.DataFrame]:
+        with pa.memory_map(str(self.path)) as source:
+            reader = ipc.open_file(source)
+            for i in range(reader.num_record_batches):
+                batch = reader.get_batch(i)
+                if columns is not None:
+                    batch = batch.select(columns)
+                # record batches are memory-mapped, only the slices converted to pandas are held in memory
+                size = batch_size or get_config().batch_rows(batch.nbytes / max(batch.num_rows, 1))
+                for offset in range(0, batch.num_rows, size):
+                    yield batch.slice(offset, size).to_pandas()
+
+    def _open_writer(self, schema: pa.Schema) -> ipc.RecordBatchFileWriter:
+        return ipc.new_file(str(self._target), schema)
+
+
+@register_format(".h5", ".hdf5", ".hdf")
+class HDF5Table(TableFile):
+    """
+    Table file backend for DataFrames stored in hdf5 files.
+
+    Data is written in pandas' 'table' format, which supports appending, column selection and chunked reads.
+    Datasets written in the 'fixed' format, e.g. by :func:`spectrum_io.file.hdf5.write_dataset`, can be read
+    as well, but are always loaded completely.
+    """
+
+    def __init__(self, path: Path, mode: str = "r", key: str = "data"):
+        """
+        Initialize a HDF5Table.
+
+        :param path: path to the table file
+        :param mode: 'r' to read, 'w' to (over)write or 'a' to append to an existing file
+        :param key: the key of the dataset within the hdf5 file
+        """
+        super().__init__(path, mode)
+        self.key = key
+        if mode == "w" and path.is_file():
+            with pd.HDFStore(path, mode="a") as store:
+                if key in store:
+                    store.remove(key)
+
+    def _is_table_format(self) -> bool:
+        with pd.HDFStore(self.path, mode="r") as store:
+            return store.get_storer(self.key).is_table
+
+    def read(self, columns: list[str] | None = None) -> pd.DataFrame:
+        """
+        Read the whole table.
+
+        :param columns: optional list of columns to read. If None, all columns are read.
+        :return: the table as pd.DataFrame
+        """
+        if self._is_table_format():
+            return pd.read_hdf(self.path, key=self.key, columns=columns)
+        df = pd.read_hdf(self.path, key=self.key)
+        return df if columns is None else df[columns]
+
+    def iter_batches(self, batch_size: int | None = None, columns: list[str] | None = None):
+        """
+        Lazily read the table in batches of at most batch_size rows.
+
+        :param batch_size: maximum number of rows per batch. If None, it is chosen such that a batch fits into the
+            max_batch_bytes of the configuration.
+        :param columns: optional list of columns to read. If None, all columns are read.
+        :return: an iterator over the batches as pd.DataFrame
+        """
+        return self._iter_batches(batch_size, columns)
+
+    def _iter_batches(self, batch_size: int | None, columns: list[str] | None) -> Iterator[pd.DataFrame]:
+        if not self._is_table_format():
+            df = self.read(columns)
+            size = batch_size or get_config().batch_rows(df.memory_usage(deep=True).sum() / max(len(df), 1))
+            for offset in range(0, len(df), size):
+                yield df.iloc[offset : offset + size]
+            return
+        with pd.HDFStore(self.path, mode="r") as store:
+            if batch_size is None:
+                sample = store.select(self.key, columns=columns, stop=csv.SAMPLE_ROWS)
+                batch_size = get_config().batch_rows(sample.memory_usage(deep=True).sum() / max(len(sample), 1))
+            yield from store.select(self.key, columns=columns, chunksize=batch_size)
+
+    def write(self, data: pd.DataFrame):
+        """
+        Write a batch of rows to the table.
+
+        :param data: the rows to write
+        """
+        self._check_writable()
+        with pd.HDFStore(self.path, mode="a") as store:
+            store.append(self.key, data, format="table", index=False)
+
+    def close(self):
+        """Finalize the table file. Nothing to do, since the hdf5 file is closed after every write."""
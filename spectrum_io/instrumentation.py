@@ -0,0 +1,163 @@
+"""Opt-in timing and counters for I/O operations."""
+
+import functools
+import logging
+import os
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+ENV_VAR = "SPECTRUM_IO_INSTRUMENTATION"
+COUNTERS = ["bytes_read", "bytes_written", "rows", "spectra", "peaks"]
+
+_enabled = os.environ.get(ENV_VAR, "").lower() in ("1", "true", "yes")
+_callbacks: list[Callable[[dict[str, Any]], None]] = []
+
+
+def enable(callback: Callable[[dict[str, Any]], None] | None = None):
+    """
+    Enable instrumentation.
+
+    Once enabled, every instrumented operation emits an event when it finishes, which is a dictionary containing
+    the operation name, its duration in seconds and all counters that were recorded (bytes_read, bytes_written,
+    rows, spectra, peaks), as well as operation-specific fields, e.g. the path that was read.
+    Events are logged at debug level with the event attached to the log record as 'event' and passed to all
+    registered callbacks. Instrumentation can also be enabled by setting the environment variable
+    SPECTRUM_IO_INSTRUMENTATION=1.
+
+    :param callback: optional callable receiving each event
+    """
+    global _enabled
+    _enabled = True
+    if callback is not None and callback not in _callbacks:
+        _callbacks.append(callback)
+
+
+def disable():
+    """Disable instrumentation and remove all registered callbacks."""
+    global _enabled
+    _enabled = False
+    _callbacks.clear()
+
+
+def is_enabled() -> bool:
+    """
+    Check whether instrumentation is enabled.
+
+    :return: True if instrumentation is enabled
+    """
+    return _enabled
+
+
+class Measurement:
+    """Counters of a single instrumented operation."""
+
+    def __init__(self, operation: str, enabled: bool, **fields):
+        """
+        Initialize a Measurement.
+
+        :param operation: name of the measured operation
+        :param enabled: whether the measurement is recorded. If False, all methods are no-ops.
+        :param fields: additional fields identifying the operation, e.g. the path that was read
+        """
+        self.operation = operation
+        self.enabled = enabled
+        self.fields = fields
+        self.counters: dict[str, int] = {}
+
+    def add(self, **counters: int):
+        """
+        Increment counters of this operation.
+
+        :param counters: names and increments of the counters, e.g. rows=100, peaks=1000
+        """
+        if not self.enabled:
+            return
+        for name, value in counters.items():
+            self.counters[name] = self.counters.get(name, 0) + int(value)
+
+
+def path_size(path: str | Path) -> int:
+    """
+    Get the size in bytes of a file or of all files within a directory.
+
+    :param path: path to a file or directory
+    :return: the size in bytes, 0 if the path does not exist
+    """
+    path = Path(path)
+    if path.is_file():
+        return path.stat().st_size
+    if path.is_dir():
+        return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+    return 0
+
+
+def _emit(event: dict[str, Any]):
+    counters = " ".join(f"{k}={v}" for k, v in event.items() if k not in ("operation", "duration_s"))
+    logger.debug(f"{event['operation']} took {event['duration_s']:.3f}s {counters}", extra={"event": event})
+    for callback in _callbacks:
+        try:
+            callback(event)
+        except Exception as e:
+            logger.exception(e)
+
+
+@contextmanager
+def measure(operation: str, **fields) -> Iterator[Measurement]:
+    """
+    Time a block of code and collect counters, if instrumentation is enabled.
+
+    :param operation: name of the measured operation, e.g. "raw.read_mzml"
+    :param fields: additional fields identifying the operation, e.g. the path that was read
+    :yield: the measurement to record counters with
+    """
+    measurement = Measurement(operation, _enabled, **fields)
+    if not measurement.enabled:
+        yield measurement
+        return
+    start = time.perf_counter()
+    try:
+        yield measurement
+    finally:
+        event = {
+            "operation": operation,
+            "duration_s": time.perf_counter() - start,
+            **{k: str(v) if isinstance(v, Path) else v for k, v in fields.items()},
+            **measurement.counters,
+        }
+        _emit(event)
+
+
+def instrument(operation: str) -> Callable:
+    """
+    Decorate a function or method to be measured as the given operation.
+
+    If the decorated function returns an object with a shape, e.g. a pandas DataFrame, its number of rows is
+    recorded. If it is a method of an object with a path attribute, the size of that path is recorded as bytes_read.
+
+    :param operation: name of the measured operation
+    :return: the decorator
+    """
+
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            path = getattr(args[0], "path", None) if args else None
+            with measure(operation, path=path) as measurement:
+                if path is not None:
+                    measurement.add(bytes_read=path_size(path))
+                result = fn(*args, **kwargs)
+                shape = getattr(result, "shape", None)
+                if shape:
+                    measurement.add(rows=shape[0])
+            return result
+
+        return wrapper
+
+    return decorator
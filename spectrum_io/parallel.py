@@ -0,0 +1,164 @@
+"""Process pool shared by all parallel operations of spectrum_io."""
+
+import atexit
+import logging
+import multiprocessing
+import os
+import threading
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import islice
+from typing import Any
+
+from . import config
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_pool: ProcessPoolExecutor | None = None
+_pool_pid: int | None = None
+_pool_workers: int | None = None
+_start_method: str | None = None
+
+
+def _init_worker(parent_config: config.Config):
+    # workers inherit the limits of the parent, but must not start pools of their own
+    settings = {name: getattr(parent_config, name) for name in parent_config.SETTINGS}
+    config.set_config(**{**settings, "max_workers": 1})
+
+
+def configure_pool(max_workers: int | None = None, start_method: str | None = None):
+    """
+    Configure the shared worker pool.
+
+    A running pool is shut down, and the next call to :func:`get_pool` starts a pool with the new configuration.
+
+    :param max_workers: number of worker processes, which sets max_workers of the global configuration, see
+        :func:`spectrum_io.config.set_config`. If None, the configured number of workers is kept.
+    :param start_method: the multiprocessing start method of the workers, one of "fork", "forkserver" or "spawn".
+        If None, the default start method of the platform is used.
+    :raises ValueError: if max_workers is smaller than 1 or the start method is not supported
+    """
+    global _start_method
+    if start_method is not None and start_method not in multiprocessing.get_all_start_methods():
+        raise ValueError(
+            f"Start method {start_method} not supported. Choose one of {multiprocessing.get_all_start_methods()}."
+        )
+    if max_workers is not None:
+        config.set_config(max_workers=max_workers)
+    shutdown_pool()
+    _start_method = start_method
+
+
+def get_max_workers() -> int:
+    """
+    Get the number of worker processes of the shared pool.
+
+    :return: the number of workers according to the current configuration
+    """
+    return config.get_config().workers
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """
+    Get the shared worker pool, starting it on first use.
+
+    The pool is reused by all parallel operations, so that the cost of starting worker processes, which under the
+    spawn and forkserver start methods includes importing spectrum_io and its dependencies in each worker, is only
+    paid once per process. A pool inherited by a forked child process is replaced, and the pool is restarted if the
+    configured number of workers changed. Use :func:`submit` to also replace a pool broken by a crashed worker.
+
+    :return: the shared process pool
+    """
+    global _pool, _pool_pid, _pool_workers
+    with _lock:
+        if _pool is not None and (_pool_pid != os.getpid() or _pool_workers != get_max_workers()):
+            # the workers of a pool inherited through fork belong to the parent, so they must not be shut down here
+            if _pool_pid == os.getpid():
+                _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+        if _pool is None:
+            context = multiprocessing.get_context(_start_method)
+            logger.debug(f"Starting worker pool with {get_max_workers()} {context.get_start_method()} workers")
+            _pool = ProcessPoolExecutor(
+                max_workers=get_max_workers(),
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(config.get_config(),),
+            )
+            _pool_pid = os.getpid()
+            _pool_workers = get_max_workers()
+        return _pool
+
+
+def shutdown_pool(wait: bool = True):
+    """
+    Shut down the shared worker pool, if it is running.
+
+    This is called automatically at interpreter exit. The pool is started again by the next call to :func:`get_pool`.
+
+    :param wait: whether to wait for pending tasks to finish. If False, pending tasks that have not started are
+        cancelled.
+    """
+    global _pool, _pool_pid
+    with _lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.shutdown(wait=wait, cancel_futures=not wait)
+        _pool = None
+        _pool_pid = None
+
+
+def _discard_pool(pool: ProcessPoolExecutor):
+    global _pool, _pool_pid
+    with _lock:
+        if _pool is pool:
+            pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+            _pool_pid = None
+
+
+def submit(fn: Callable, /, *args, **kwargs) -> Future:
+    """
+    Submit a function call to the shared worker pool.
+
+    If the pool is broken, e.g. because a worker crashed, it is replaced by a new pool and the call is submitted
+    again. Calls that were already submitted to the broken pool still fail.
+
+    :param fn: a picklable function, i.e. defined at module level or a staticmethod
+    :param args: positional arguments of the call
+    :param kwargs: keyword arguments of the call
+    :return: the future of the result
+    """
+    pool = get_pool()
+    try:
+        return pool.submit(fn, *args, **kwargs)
+    except BrokenProcessPool:
+        logger.warning("Worker pool is broken, starting a new pool")
+        _discard_pool(pool)
+        return get_pool().submit(fn, *args, **kwargs)
+
+
+def parallel_map(fn: Callable, iterable: Iterable, max_in_flight: int | None = None) -> Iterator[Any]:
+    """
+    Apply a function to each element of an iterable using the shared worker pool.
+
+    Elements are submitted as results are collected, such that at most max_in_flight elements are held by the pool
+    at the same time, and a lazily generated iterable is only consumed as far as needed.
+
+    :param fn: a picklable function, i.e. defined at module level or a staticmethod
+    :param iterable: the arguments to apply the function to
+    :param max_in_flight: maximum number of elements submitted, but not yet collected. If None, twice the number
+        of workers are in flight, so that workers do not idle while results are collected.
+    :yield: the results, in the order of the iterable
+    """
+    iterator = iter(iterable)
+    pending = deque(submit(fn, arg) for arg in islice(iterator, max_in_flight or 2 * get_max_workers()))
+    while pending:
+        result = pending.popleft().result()
+        pending.extend(submit(fn, arg) for arg in islice(iterator, 1))
+        yield result
+
+
+atexit.register(shutdown_pool)
@@ -1,8 +1,14 @@
 """Init raw."""
 
 import logging
+from typing import TYPE_CHECKING
 
-from .thermo_raw import ThermoRaw
+from .._lazy import attach
+
+if TYPE_CHECKING:
+    from .thermo_raw import ThermoRaw
+
+__getattr__, __dir__ = attach(__name__, attributes={"ThermoRaw": "thermo_raw"})
 
 __all__ = ["ThermoRaw"]
 
@@ -4,10 +4,10 @@ from pathlib import Path
 from xml.etree import ElementTree
 
 import pandas as pd
-import pymzml
-from pyteomics import mzml
 from spectrum_fundamentals.constants import MZML_DATA_COLUMNS
 
+from spectrum_io.instrumentation import measure, path_size
+
 logger = logging.getLogger(__name__)
 
 
@@ -132,18 +132,28 @@ class MSRaw:
         """
         file_list = MSRaw.get_file_list(source, ext)
 
-        if package == "pymzml":
-            data = MSRaw._read_mzml_pymzml(file_list, scanidx, *args, **kwargs)
-        elif package == "pyteomics":
-            data = MSRaw._read_mzml_pyteomics(file_list, *args, **kwargs)
-        else:
-            raise AssertionError("Choose either 'pymzml' or 'pyteomics'")
+        with measure("raw.read_mzml", package=package, n_files=len(file_list)) as measurement:
+            if package == "pymzml":
+                data = MSRaw._read_mzml_pymzml(file_list, scanidx, *args, **kwargs)
+            elif package == "pyteomics":
+                data = MSRaw._read_mzml_pyteomics(file_list, *args, **kwargs)
+            else:
+                raise AssertionError("Choose either 'pymzml' or 'pyteomics'")
 
-        data["SCAN_NUMBER"] = pd.to_numeric(data["SCAN_NUMBER"])
+            data["SCAN_NUMBER"] = pd.to_numeric(data["SCAN_NUMBER"])
+            if measurement.enabled:
+                measurement.add(
+                    bytes_read=sum(path_size(file_path) for file_path in file_list),
+                    spectra=len(data),
+                    peaks=data["INTENSITIES"].map(len).sum(),
+                )
         return data
 
     @staticmethod
     def _read_mzml_pymzml(file_list: list[Path], scanidx: list | None = None, *args, **kwargs) -> pd.DataFrame:
+        # the parsers are imported on demand, since only one of them is needed and both are slow to import
+        import pymzml
+
         data_dict = {}
         with warnings.catch_warnings():
             warnings.filterwarnings("ignore", category=ImportWarning)
@@ -209,6 +219,8 @@ class MSRaw:
 
     @staticmethod
     def _read_mzml_pyteomics(file_list: list[Path], *args, **kwargs) -> pd.DataFrame:
+        from pyteomics import mzml
+
         data_dict = {}
         for file_path in file_list:
             mass_analyzer = get_mass_analyzer(file_path)
@@ -1,13 +1,33 @@
 """Initialize seach result."""
 
-from .mascot import Mascot
-from .maxquant import MaxQuant
-from .msamanda import MSAmanda
-from .msfragger import MSFragger
-from .openms import OpenMS
-from .sage import Sage
-from .scout import Scout
-from .xisearch import Xisearch
+from typing import TYPE_CHECKING
+
+from .._lazy import attach
+
+if TYPE_CHECKING:
+    from .mascot import Mascot
+    from .maxquant import MaxQuant
+    from .msamanda import MSAmanda
+    from .msfragger import MSFragger
+    from .openms import OpenMS
+    from .sage import Sage
+    from .scout import Scout
+    from .xisearch import Xisearch
+
+# each search engine is imported on first access, so that e.g. reading MaxQuant results does not import pyopenms
+__getattr__, __dir__ = attach(
+    __name__,
+    attributes={
+        "Mascot": "mascot",
+        "MaxQuant": "maxquant",
+        "MSAmanda": "msamanda",
+        "MSFragger": "msfragger",
+        "OpenMS": "openms",
+        "Sage": "sage",
+        "Scout": "scout",
+        "Xisearch": "xisearch",
+    },
+)
 
 __all__ = [
     "Mascot",
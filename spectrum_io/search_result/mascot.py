@@ -5,6 +5,8 @@ import pandas as pd
 import spectrum_fundamentals.constants as c
 from spectrum_fundamentals.mod_string import internal_without_mods
 
+from spectrum_io.instrumentation import instrument
+
 from .search_results import SearchResults
 
 logger = logging.getLogger(__name__)
@@ -18,6 +20,7 @@ class Mascot(SearchResults):
         """Standard modifications that are always applied if not otherwise specified."""
         return {}
 
+    @instrument("search_result.Mascot.read_result")
     def read_result(
         self,
         tmt_label: str = "",
@@ -7,6 +7,8 @@ import pandas as pd
 import spectrum_fundamentals.constants as c
 from spectrum_fundamentals.mod_string import add_permutations, internal_without_mods
 
+from spectrum_io.instrumentation import instrument
+
 from .search_results import SearchResults, parse_mods
 
 logger = logging.getLogger(__name__)
@@ -67,6 +69,11 @@ class MaxQuant(SearchResults):
 
         return self.results
 
+    def _input_files(self) -> list[Path]:
+        """List the msms.txt of the txt folder, which is the only file read by read_result."""
+        return [self.path / "msms.txt"]
+
+    @instrument("search_result.MaxQuant.read_result")
     def read_result(
         self,
         tmt_label: str = "",
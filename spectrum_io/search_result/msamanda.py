@@ -1,10 +1,13 @@
 from __future__ import annotations
 
 import logging
+from pathlib import Path
 
 import pandas as pd
 from spectrum_fundamentals.constants import PARTICLE_MASSES
 
+from spectrum_io.instrumentation import instrument
+
 from .search_results import SearchResults, parse_mods
 
 logger = logging.getLogger(__name__)
@@ -18,6 +21,13 @@ class MSAmanda(SearchResults):
         """Standard modifications that are always applied if not otherwise specified."""
         return {"m": 35, "c": 4}
 
+    def _input_files(self) -> list[Path]:
+        """List the result files read by read_result with its default suffix, which generate_internal uses."""
+        if self.path.is_dir():
+            return sorted(self.path.glob("*output.csv"))
+        return [self.path]
+
+    @instrument("search_result.MSAmanda.read_result")
     def read_result(
         self,
         tmt_label: str = "",
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import logging
+from pathlib import Path
 
 import pandas as pd
 import spectrum_fundamentals.constants as c
@@ -8,6 +9,8 @@ from pyteomics import pepxml
 from spectrum_fundamentals.mod_string import add_permutations, internal_without_mods
 from tqdm import tqdm
 
+from spectrum_io.instrumentation import instrument
+
 from .search_results import SearchResults, parse_mods
 
 logger = logging.getLogger(__name__)
@@ -34,6 +37,13 @@ class MSFragger(SearchResults):
 
         return self.results
 
+    def _input_files(self) -> list[Path]:
+        """List the pepXML files read by read_result."""
+        if self.path.is_dir():
+            return sorted(self.path.rglob("*.pepXML"))
+        return [self.path]
+
+    @instrument("search_result.MSFragger.read_result")
     def read_result(
         self,
         tmt_label: str = "",
@@ -8,6 +8,8 @@ from pyopenms import IdXMLFile, PeptideIdentification, ProteinIdentification
 from spectrum_fundamentals.mod_string import internal_without_mods
 from tqdm import tqdm
 
+from spectrum_io.instrumentation import instrument
+
 from .search_results import SearchResults, parse_mods
 
 logger = logging.getLogger(__name__)
@@ -145,6 +147,13 @@ class OpenMS(SearchResults):
         """Standard modifications that are always applied if not otherwise specified."""
         return {"C(Carbamidomethyl)": 4, "M(Oxidation)": 35, "R(Deamidated)": 7, "Q(Deamidated)": 7, "N(Deamidated)": 7}
 
+    def _input_files(self) -> list[Path]:
+        """List the idXML files read by read_result."""
+        if self.path.is_dir():
+            return sorted(self.path.rglob("*.idXML"))
+        return [self.path]
+
+    @instrument("search_result.OpenMS.read_result")
     def read_result(
         self,
         tmt_label: str = "",
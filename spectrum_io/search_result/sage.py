@@ -6,6 +6,8 @@ import pandas as pd
 import spectrum_fundamentals.constants as c
 from spectrum_fundamentals.mod_string import internal_without_mods
 
+from spectrum_io.instrumentation import instrument
+
 from .search_results import SearchResults, parse_mods
 
 logger = logging.getLogger(__name__)
@@ -26,6 +28,7 @@ class Sage(SearchResults):
             "N[+0.98402]": 7,
         }
 
+    @instrument("search_result.Sage.read_result")
     def read_result(
         self,
         tmt_label: str = "",
@@ -7,6 +7,8 @@ import numpy as np
 import pandas as pd
 from spectrum_fundamentals.mod_string import xisearch_to_internal
 
+from spectrum_io.instrumentation import instrument
+
 from .search_results import SearchResults
 
 logger = logging.getLogger(__name__)
@@ -15,6 +17,7 @@ logger = logging.getLogger(__name__)
 class Scout(SearchResults):
     """Handle search results from xisearch."""
 
+    @instrument("search_result.Scout.read_result")
     def read_result(
         self,
         tmt_label: str = "",
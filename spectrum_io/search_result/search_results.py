@@ -1,16 +1,140 @@
 from __future__ import annotations
 
+import hashlib
+import json
 import logging
 import re
 from abc import abstractmethod
 from pathlib import Path
 
 import pandas as pd
+import pyarrow as pa
 
-from spectrum_io.file import csv
+from spectrum_io import __version__
+from spectrum_io.file import csv, feather, parquet, table
 
 logger = logging.getLogger(__name__)
 
+INTERNAL_DTYPES = {
+    "RAW_FILE": str,
+    "SCAN_NUMBER": "int64",
+    "MODIFIED_SEQUENCE": str,
+    "SEQUENCE": str,
+    "PRECURSOR_CHARGE": "int64",
+    "PEPTIDE_LENGTH": "int64",
+    "MASS": "float64",
+    "SCORE": "float64",
+    "REVERSE": bool,
+    "PROTEINS": str,
+}
+INTERNAL_SCHEMA = pa.schema(
+    [
+        ("RAW_FILE", pa.string()),
+        ("SCAN_NUMBER", pa.int64()),
+        ("MODIFIED_SEQUENCE", pa.string()),
+        ("SEQUENCE", pa.string()),
+        ("PRECURSOR_CHARGE", pa.int64()),
+        ("PEPTIDE_LENGTH", pa.int64()),
+        ("MASS", pa.float64()),
+        ("SCORE", pa.float64()),
+        ("REVERSE", pa.bool_()),
+        ("PROTEINS", pa.string()),
+    ]
+)
+# suffixes are taken from the table registry, so that a path is cached in the format open_table reads it with
+BINARY_CACHE_FORMATS = {
+    suffix: module
+    for backend, module in [(table.ParquetTable, parquet), (table.FeatherTable, feather)]
+    for suffix in table.registered_suffixes(backend)
+}
+FINGERPRINT_SUFFIX = ".fingerprint.json"
+_HASH_BLOCK_SIZE = 1 << 20
+
+
+def _internal_schema(df: pd.DataFrame) -> pa.Schema:
+    """Infer the Arrow schema of a table in internal format, using the types of INTERNAL_SCHEMA where applicable."""
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    for field in INTERNAL_SCHEMA:
+        idx = schema.get_field_index(field.name)
+        if idx != -1:
+            schema = schema.set(idx, field)
+    return schema
+
+
+def read_internal_table(path: Path) -> pd.DataFrame:
+    """
+    Read a table in internal format, choosing the file format based on the suffix of the path.
+
+    Parquet (.parquet, .pq) and Feather (.feather, .arrow, .ipc) files are read with the exact dtypes they were written
+    with, any other suffix is read as csv using INTERNAL_DTYPES.
+
+    :param path: path to the file to read
+    :return: the table in internal format
+    """
+    binary_format = BINARY_CACHE_FORMATS.get(path.suffix.lower())
+    if binary_format is None:
+        return csv.read_file(path, dtype=INTERNAL_DTYPES)
+    return binary_format.read_file(path)
+
+
+def write_internal_table(df: pd.DataFrame, path: Path):
+    """
+    Write a table in internal format, choosing the file format based on the suffix of the path.
+
+    Parquet (.parquet, .pq) and Feather (.feather, .arrow, .ipc) files are written with INTERNAL_SCHEMA, any other suffix
+    is written as csv.
+
+    :param df: the table in internal format
+    :param path: path to the file to write
+    """
+    binary_format = BINARY_CACHE_FORMATS.get(path.suffix.lower())
+    if binary_format is None:
+        csv.write_file(df, path)
+    else:
+        binary_format.write_file(df, path, schema=_internal_schema(df))
+
+
+def _file_hash(path: Path) -> str:
+    """Hash the complete content of a file, reading it in blocks of _HASH_BLOCK_SIZE."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while block := f.read(_HASH_BLOCK_SIZE):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _input_name(file_path: Path, root: Path) -> str:
+    return file_path.relative_to(root).as_posix() if root.is_dir() else file_path.name
+
+
+def _input_fingerprint(files: list[Path], root: Path) -> list[dict[str, str | int]]:
+    """Collect size, modification time and a content hash of the given files, named relative to root."""
+    fingerprint = []
+    for file_path in files:
+        stat = file_path.stat()
+        fingerprint.append(
+            {
+                "path": _input_name(file_path, root),
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "hash": _file_hash(file_path),
+            }
+        )
+    return fingerprint
+
+
+def _inputs_changed(stored: list[dict[str, str | int]], files: list[Path], root: Path) -> bool:
+    """Compare stored input fingerprints to the current state, only hashing files whose modification time changed."""
+    if len(files) != len(stored):
+        return True
+    for file_path, stored_file in zip(files, stored, strict=True):
+        stat = file_path.stat()
+        if _input_name(file_path, root) != stored_file["path"] or stat.st_size != stored_file["size"]:
+            return True
+        if stat.st_mtime_ns != stored_file["mtime_ns"] and _file_hash(file_path) != stored_file["hash"]:
+            return True
+    return False
+
 
 def parse_mods(mods: dict[str, int]) -> dict[str, str]:
     """
@@ -108,6 +232,15 @@ class SearchResults:
         """
         Generate df and save to out_path if provided.
 
+        If out_path already exists, the search results are not converted again but read from out_path instead.
+        A fingerprint of the search result file(s), the parser version and the provided parameters is stored
+        alongside out_path, and the search results are converted again if any of them changed since. Input files
+        are hashed completely when converted. Later calls only hash inputs whose modification time changed, so an
+        input that was touched but not modified is not converted again.
+        The file format is chosen based on the suffix of out_path: Parquet (.parquet, .pq) and Feather
+        (.feather, .arrow) caches preserve the dtypes of all columns and are considerably faster to read and write
+        than the default csv format.
+
         :param out_path: path to output
         :param tmt_label: tmt label as str
         :param custom_mods: dict with static and variable custom modifications, their internal identifier and mass
@@ -126,24 +259,104 @@ class SearchResults:
         if isinstance(out_path, str):
             out_path = Path(out_path)
 
-        if out_path.is_file():
+        parameters = {
+            "tmt_label": tmt_label,
+            "custom_mods": custom_mods,
+            "ptm_unimod_id": ptm_unimod_id,
+            "ptm_sites": ptm_sites,
+            "xl": xl,
+        }
+        if out_path.is_file() and self._is_cache_valid(out_path, parameters):
             # only read converted and return
             logger.info(f"Found search results in internal format at {out_path}, skipping conversion")
             # TODO: internal_to_unimod
-            return csv.read_file(out_path)
+            return read_internal_table(out_path)
 
-        # convert, save and return
+        # convert, save and return, fingerprinting the inputs as they are read
+        fingerprint = self._fingerprint(parameters, self._cache_inputs(out_path))
         df = self.read_result(tmt_label, custom_mods=custom_mods, ptm_unimod_id=ptm_unimod_id, ptm_sites=ptm_sites)
-        csv.write_file(df, out_path)
+        write_internal_table(df, out_path)
+        with open(self._fingerprint_path(out_path), "w") as f:
+            json.dump(fingerprint, f, indent=2)
         return df
 
+    @staticmethod
+    def _fingerprint_path(out_path: Path) -> Path:
+        return out_path.with_name(out_path.name + FINGERPRINT_SUFFIX)
+
+    def _input_files(self) -> list[Path]:
+        """
+        List the search result files read by read_result, which are fingerprinted to validate cached conversions.
+
+        Parsers reading only some of the files of a directory override this, so that unrelated files are neither
+        hashed nor invalidate the cache.
+
+        :return: the path if it is a file, else all files within the directory
+        """
+        if self.path.is_dir():
+            return sorted(path for path in self.path.rglob("*") if path.is_file())
+        return [self.path]
+
+    def _cache_inputs(self, out_path: Path) -> list[Path]:
+        """List the existing input files, excluding the cache at out_path and fingerprints stored next to caches."""
+        excluded = {out_path.resolve(), self._fingerprint_path(out_path).resolve()}
+        return [
+            path
+            for path in self._input_files()
+            if path.is_file() and path.resolve() not in excluded and not path.name.endswith(FINGERPRINT_SUFFIX)
+        ]
+
+    def _fingerprint(self, parameters: dict, inputs: list[Path] | None = None) -> dict:
+        """
+        Create a fingerprint identifying a conversion of the search results.
+
+        :param parameters: the parameters passed to generate_internal
+        :param inputs: optional input files whose size, modification time and hash are included
+        :return: a json serializable dictionary describing parser, parameters and inputs
+        """
+        fingerprint = {
+            "parser": type(self).__name__,
+            "version": __version__,
+            "parameters": hashlib.sha256(json.dumps(parameters, sort_keys=True, default=str).encode()).hexdigest(),
+        }
+        if inputs is not None:
+            fingerprint["inputs"] = _input_fingerprint(inputs, self.path)
+        return fingerprint
+
+    def _is_cache_valid(self, out_path: Path, parameters: dict) -> bool:
+        """
+        Check whether a table in internal format at out_path was generated from the current inputs and parameters.
+
+        :param out_path: path to the table in internal format
+        :param parameters: the parameters passed to generate_internal
+        :return: False if the fingerprint stored alongside out_path is missing or differs from the current one, True
+            otherwise
+        """
+        fingerprint_path = self._fingerprint_path(out_path)
+        if not fingerprint_path.is_file():
+            logger.info(f"No fingerprint found for {out_path}, cannot verify that it is up to date, converting again")
+            return False
+        with open(fingerprint_path) as f:
+            stored = json.load(f)
+        current = self._fingerprint(parameters)
+        if any(stored.get(key) != value for key, value in current.items()):
+            logger.info(f"Parser or parameters changed since {out_path} was generated, converting again")
+            return False
+        if not self.path.exists():
+            logger.warning(f"{self.path} does not exist, cannot verify that {out_path} is up to date.")
+            return True
+        if _inputs_changed(stored.get("inputs", []), self._cache_inputs(out_path), self.path):
+            logger.info(f"Search results changed since {out_path} was generated, converting again")
+            return False
+        return True
+
     def read_internal(self) -> pd.DataFrame:
         """
         Read file from path.
 
         :return: dataframe after reading the file
         """
-        return csv.read_file(self.path)
+        return csv.read_file(self.path, dtype=INTERNAL_DTYPES, engine="c")
 
     @abstractmethod
     def convert_to_internal(self, mods: dict[str, str], ptm_unimod_id: int | None, ptm_sites: list[str] | None):
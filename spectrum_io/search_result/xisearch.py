@@ -1,24 +1,28 @@
 from __future__ import annotations
 
 import logging
-import os
 from math import ceil
 
-# import multiprocess as mp
-from multiprocessing import pool
-
 import numpy as np
 import pandas as pd
 from spectrum_fundamentals.mod_string import xisearch_to_internal
 
+from spectrum_io.config import get_config
+from spectrum_io.instrumentation import instrument
+from spectrum_io.parallel import get_max_workers, parallel_map
+
 from .search_results import SearchResults
 
 logger = logging.getLogger(__name__)
 
+# number of rows used to estimate the memory usage of a row
+SAMPLE_ROWS = 1_000
+
 
 class Xisearch(SearchResults):
     """Handle search results from xisearch."""
 
+    @instrument("search_result.Xisearch.read_result")
     def read_result(
         self,
         tmt_label: str = "",
@@ -279,15 +283,16 @@ class Xisearch(SearchResults):
 
     @staticmethod
     def _self_or_between_mp(df):
-        pool_size = min([10, os.cpu_count()])
-        slice_size = ceil(len(df) / pool_size)
+        pool_size = min(10, get_max_workers())
         cols = ["protein_p1", "protein_p2"]
         df = df[cols]
-        df_slices = [df.iloc[i * slice_size : (i + 1) * slice_size][cols] for i in range(pool_size)]
-        print("slicing done")
-        print(f"Pool size: {pool_size}")
-        with pool.Pool(processes=pool_size) as self_or_between_pool:
-            map_res = self_or_between_pool.map(Xisearch._self_or_between, df_slices)
+        # slices are limited such that those in flight fit into the max_batch_bytes of the configuration
+        sample = df.head(SAMPLE_ROWS)
+        bytes_per_row = sample.memory_usage(deep=True, index=False).sum() / max(len(sample), 1)
+        slice_size = max(1, min(ceil(len(df) / pool_size), get_config().batch_rows(bytes_per_row, in_flight=pool_size)))
+        df_slices = (df.iloc[start : start + slice_size].copy() for start in range(0, max(len(df), 1), slice_size))
+        logger.debug(f"Split {len(df)} CSMs into slices of {slice_size} rows, {pool_size} in flight")
+        map_res = parallel_map(Xisearch._self_or_between, df_slices, max_in_flight=pool_size)
         return pd.concat(map_res).copy()
 
     @staticmethod
@@ -1,13 +1,30 @@
 """Initialize spectral library."""
 
 import logging
+from typing import TYPE_CHECKING
 
-from . import digest
-from .dlib import DLib
-from .msp import MSP
-from .spectral_library import SpectralLibrary
-from .spectronaut import Spectronaut
+from .._lazy import attach
 
-__all__ = ["DLib", "MSP", "SpectralLibrary", "Spectronaut", "digest"]
+if TYPE_CHECKING:
+    from . import digest
+    from .dlib import DLib
+    from .msp import MSP
+    from .shared_memory import SharedBatch
+    from .spectral_library import SpectralLibrary
+    from .spectronaut import Spectronaut
+
+__getattr__, __dir__ = attach(
+    __name__,
+    submodules=["digest"],
+    attributes={
+        "DLib": "dlib",
+        "MSP": "msp",
+        "SharedBatch": "shared_memory",
+        "SpectralLibrary": "spectral_library",
+        "Spectronaut": "spectronaut",
+    },
+)
+
+__all__ = ["DLib", "MSP", "SharedBatch", "SpectralLibrary", "Spectronaut", "digest"]
 
 logger = logging.getLogger(__name__)
@@ -0,0 +1,105 @@
+import os
+from collections.abc import Iterator
+from contextlib import contextmanager
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+import pandas as pd
+
+_ALIGNMENT = 64
+
+
+class SharedBatch:
+    """
+    Descriptor of a batch of predictions stored in a named shared memory block.
+
+    Putting a SharedBatch instead of a (data, metadata) tuple on the queue passed to
+    :meth:`SpectralLibrary.async_write` only transfers this small descriptor (block name, array offsets, shapes
+    and dtypes, and the metadata) between processes. The arrays themselves are read directly from shared
+    memory by the writer, which avoids pickling and unpickling them.
+
+    Ownership of the block is handed over to the consumer, which unlinks it after writing the batch. On Windows,
+    shared memory is released as soon as no process holds a handle, so the producer needs to keep the SharedBatch
+    object alive until the batch is consumed.
+    """
+
+    def __init__(
+        self, name: str, layout: dict[str, tuple[int, tuple[int, ...], str]], metadata: pd.DataFrame, size: int
+    ):
+        """
+        Initialize a SharedBatch. Use :meth:`from_arrays` to create one from numpy arrays.
+
+        :param name: name of the shared memory block
+        :param layout: mapping of array keys to their byte offset within the block, shape and dtype string
+        :param metadata: a dataframe with the metadata of the batch
+        :param size: the size of the shared memory block in bytes
+        """
+        self.name = name
+        self.layout = layout
+        self.metadata = metadata
+        self.size = size
+        self._shm: SharedMemory | None = None
+
+    @classmethod
+    def from_arrays(cls, data: dict[str, np.ndarray], metadata: pd.DataFrame) -> "SharedBatch":
+        """
+        Copy a batch of arrays into a new shared memory block.
+
+        :param data: Dictionary containing the arrays of the batch, e.g. intensities, mz, annotation and irt
+        :param metadata: a dataframe with the metadata of the batch
+        :raises TypeError: if any of the arrays has dtype object, which cannot be stored in shared memory
+        :return: the descriptor of the shared batch
+        """
+        layout = {}
+        size = 0
+        for key, array in data.items():
+            if array.dtype.hasobject:
+                raise TypeError(f"Array {key} has dtype object and cannot be stored in shared memory.")
+            layout[key] = (size, array.shape, array.dtype.str)
+            size += -(-array.nbytes // _ALIGNMENT) * _ALIGNMENT
+        shm = SharedMemory(create=True, size=max(size, 1))
+        for key, array in data.items():
+            offset, shape, dtype = layout[key]
+            np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)[...] = array
+        batch = cls(shm.name, layout, metadata, size)
+        if os.name == "posix":
+            # the consumer is responsible for unlinking, so the producer's resource tracker must not do it on exit
+            resource_tracker.unregister(shm._name, "shared_memory")  # type: ignore[attr-defined]
+            shm.close()
+        else:
+            batch._shm = shm
+        return batch
+
+    @contextmanager
+    def attach(self) -> Iterator[tuple[dict[str, np.ndarray], pd.DataFrame]]:
+        """
+        Attach to the shared memory block and provide the arrays of the batch.
+
+        The arrays are views of the shared memory and must not be used after leaving the context, upon which the
+        block is closed and unlinked.
+
+        :yield: a tuple of the data dictionary and the metadata dataframe
+        """
+        shm = SharedMemory(name=self.name)
+        try:
+            yield (
+                {
+                    key: np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+                    for key, (offset, shape, dtype) in self.layout.items()
+                },
+                self.metadata,
+            )
+        finally:
+            shm.unlink()
+            try:
+                shm.close()
+            except BufferError:
+                # views are still referenced by the caller, the mapping is released once they are garbage collected
+                pass
+
+    def __getstate__(self) -> dict:
+        """Exclude the handle to the shared memory block when sending the descriptor to another process."""
+        state = self.__dict__.copy()
+        state["_shm"] = None
+        return state
@@ -1,5 +1,7 @@
 import re
 from abc import abstractmethod
+from collections.abc import Iterator
+from contextlib import contextmanager
 from multiprocessing import Queue
 from multiprocessing.managers import ValueProxy
 from pathlib import Path
@@ -9,6 +11,10 @@ from typing import IO
 import numpy as np
 import pandas as pd
 
+from spectrum_io.instrumentation import Measurement, measure, path_size
+
+from .shared_memory import SharedBatch
+
 
 def parse_mods(mods: dict[str, int]) -> dict[str, str]:
     """
@@ -100,9 +106,11 @@ class SpectralLibrary:
         :param kwargs: Keyword arguments to be passed to the internal _write method.
         """
         parsed_mods = parse_mods(self.standard_mods | (custom_mods or {}))
-        with self._get_handle() as out:
-            self._initialize(out)
-            self._write(out, mods=parsed_mods, **kwargs)
+        with self._measure("spectral_library.write") as measurement:
+            with self._get_handle() as out:
+                self._initialize(out)
+                self._write(out, mods=parsed_mods, **kwargs)
+                self._count_written(measurement, kwargs.get("data"), kwargs.get("metadata"))
 
     def _get_handle(self):
         return open(self.out_path, self.mode)
@@ -111,21 +119,46 @@ class SpectralLibrary:
         """
         Asynchronously write content to the output file from a queue.
 
-        :param queue: A queue from which content will be retrieved for writing.
+        :param queue: A queue from which content will be retrieved for writing. Each item is either a tuple of
+            data and metadata, or a :class:`SharedBatch` referencing data in shared memory, which avoids pickling
+            the arrays when sending them between processes. None signals the end of the queue.
         :param progress: An integer value representing the progress of the writing process.
         :param custom_mods: dict with custom variable and static identifier and respecitve internal equivalent and mass
         """
         parsed_mods = parse_mods(self.standard_mods | (custom_mods or {}))
 
-        with self._get_handle() as out:
-            self._initialize(out)
-            while True:
-                content = queue.get()
-                if content is None:
-                    break
-                data, metadata = content
-                self._write(out, data=data, metadata=metadata, mods=parsed_mods)
-                progress.value += 1
+        with self._measure("spectral_library.async_write") as measurement:
+            with self._get_handle() as out:
+                self._initialize(out)
+                while True:
+                    content = queue.get()
+                    if content is None:
+                        break
+                    if isinstance(content, SharedBatch):
+                        with content.attach() as (data, metadata):
+                            self._write(out, data=data, metadata=metadata, mods=parsed_mods)
+                            self._count_written(measurement, data, metadata)
+                    else:
+                        data, metadata = content
+                        self._write(out, data=data, metadata=metadata, mods=parsed_mods)
+                        self._count_written(measurement, data, metadata)
+                    progress.value += 1
+
+    @contextmanager
+    def _measure(self, operation: str) -> Iterator[Measurement]:
+        with measure(operation, format=type(self).__name__, path=self.out_path) as measurement:
+            size_before = path_size(self.out_path) if measurement.enabled and self.mode == "a" else 0
+            yield measurement
+            if measurement.enabled:
+                measurement.add(bytes_written=path_size(self.out_path) - size_before)
+
+    def _count_written(
+        self, measurement: Measurement, data: dict[str, np.ndarray] | None, metadata: pd.DataFrame | None
+    ):
+        if not measurement.enabled or data is None or metadata is None:
+            return
+        passed = self._fragment_filter_passed(data["mz"], data["intensities"])
+        measurement.add(spectra=len(metadata), peaks=np.count_nonzero(passed))
 
     def _fragment_filter_passed(self, f_mz: np.ndarray | float, f_int: np.ndarray | float) -> np.ndarray | bool:
         """
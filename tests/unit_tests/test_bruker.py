@@ -1,9 +1,392 @@
+import os
+import tempfile
 import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from spectrum_io import config, parallel
+from spectrum_io.d import bruker
+from spectrum_io.d.binning import BINNING_METHODS, bin_peaks, bin_spectra
+from spectrum_io.d.masterPeak import MasterPeak
+from spectrum_io.d.masterSpectrum import _calculate_delta_by_ppm
+from spectrum_io.d.peak import Peak
+
+
+def _pasef_spectrum(seed: int = 0, n_fragments: int = 30, n_scans: int = 15) -> tuple[np.ndarray, np.ndarray]:
+    """Create the peaks of several scans of a precursor, each fragment observed with a few ppm mass error."""
+    rng = np.random.default_rng(seed)
+    fragments = np.sort(rng.uniform(100, 1500, n_fragments))
+    fragments = fragments[np.diff(fragments, prepend=0) > 1]
+    mzs = np.repeat(fragments, n_scans) * (1 + rng.uniform(-5e-6, 5e-6, fragments.size * n_scans))
+    intensities = rng.integers(10, 1000, mzs.size)
+    order = rng.permutation(mzs.size)
+    return mzs[order], intensities[order]
+
+
+class _FakeTimsTOF:
+    """Stand-in for alphatims.bruker.TimsTOF holding a table of raw peaks."""
+
+    def __init__(self, peaks: pd.DataFrame):
+        self.peaks = peaks
+        self.intensity_values = peaks["INTENSITIES"].to_numpy()
+        self.frame_max_index = peaks["FRAME"].max() + 1
+
+    def __getitem__(self, key: tuple) -> np.ndarray:
+        frames, _, precursors = key
+        return np.flatnonzero(self.peaks["FRAME"].isin(frames) & self.peaks["PRECURSOR"].isin(precursors))
+
+    def convert_from_indices(self, raw_indices: np.ndarray, **kwargs) -> dict[str, np.ndarray]:
+        columns = {
+            "frame_indices": "FRAME",
+            "scan_indices": "SCAN",
+            "precursor_indices": "PRECURSOR",
+            "rt_values": "RETENTION_TIME",
+            "mobility_values": "INV_ION_MOBILITY",
+            "mz_values": "MZ",
+            "intensity_values": "INTENSITIES",
+        }
+        return {key: self.peaks[column].to_numpy()[raw_indices] for key, column in columns.items()}
+
+
+def _fake_timstof(n_precursors: int = 6) -> tuple[_FakeTimsTOF, pd.DataFrame]:
+    """Create raw peaks and a scan to precursor map of precursors fragmented in two frames each."""
+    rng = np.random.default_rng(0)
+    scan_to_precursor_map = pd.DataFrame(
+        {
+            "SCAN_NUMBER": np.repeat(np.arange(n_precursors), 2),
+            "PRECURSOR": np.repeat(np.arange(n_precursors) + 1, 2),
+            "FRAME": np.arange(2 * n_precursors) + 1,
+            "SCAN_NUM_BEGIN": 10,
+            "SCAN_NUM_END": 20,
+            "COLLISION_ENERGY": 30.0,
+        }
+    )
+    peaks = scan_to_precursor_map[["FRAME", "PRECURSOR"]].loc[np.repeat(scan_to_precursor_map.index, 5)]
+    peaks = peaks.assign(
+        SCAN=rng.integers(5, 25, len(peaks)),
+        RETENTION_TIME=peaks["FRAME"] * 1.5,
+        INV_ION_MOBILITY=1.0,
+        MZ=rng.uniform(100, 1000, len(peaks)),
+        INTENSITIES=rng.uniform(1, 100, len(peaks)),
+    )
+    peaks = peaks[["FRAME", "SCAN", "PRECURSOR", "RETENTION_TIME", "INV_ION_MOBILITY", "MZ", "INTENSITIES"]]
+    return _FakeTimsTOF(peaks.reset_index(drop=True)), scan_to_precursor_map
 
 
 class TestBruker(unittest.TestCase):
     """Test class for bruker spectra files."""
 
     def test_convert_hdf(self):
-        """Tests the function to convert .d to hdf files. Currently passed."""
-        pass
+        """Tests the function to convert .d to hdf files, given the output path as string."""
+        with tempfile.TemporaryDirectory() as temp_dir, patch("alphatims.bruker.TimsTOF") as timstof:
+            bruker.convert_d_hdf("run.d", str(Path(temp_dir) / "run.hdf"))
+        timstof.assert_called_once_with("run.d")
+        timstof.return_value.save_as_hdf.assert_called_once_with(directory=temp_dir, file_name="run.hdf")
+
+    def test_cache_timstof_hdf(self):
+        """Test that d folders are converted once and found in the cache by their content."""
+
+        def save_as_hdf(directory: str, file_name: str, overwrite: bool):
+            (Path(directory) / file_name).write_text("hdf")
+
+        with tempfile.TemporaryDirectory() as temp_dir, patch("alphatims.bruker.TimsTOF") as timstof:
+            timstof.return_value.save_as_hdf.side_effect = save_as_hdf
+            d_folder = Path(temp_dir) / "run.d"
+            d_folder.mkdir()
+            (d_folder / "analysis.tdf").write_bytes(b"metadata")
+            cache_dir = Path(temp_dir) / "cache"
+            hdf_file = bruker.cache_timstof_hdf(d_folder, cache_dir)
+            self.assertTrue(hdf_file.is_file())
+            self.assertEqual(hdf_file.parent, cache_dir)
+            self.assertEqual(bruker.cache_timstof_hdf(str(d_folder), cache_dir), hdf_file)
+            self.assertEqual(timstof.call_count, 1)
+            (d_folder / "analysis.tdf").write_bytes(b"changed metadata")
+            self.assertNotEqual(bruker.cache_timstof_hdf(d_folder, cache_dir), hdf_file)
+            self.assertEqual(timstof.call_count, 2)
+            self.assertEqual(len(list(cache_dir.iterdir())), 2)
+
+    def test_content_key_peak_data(self):
+        """Test that large peak data is keyed by samples and modification time, and other files by their content."""
+        with (
+            tempfile.TemporaryDirectory() as temp_dir,
+            patch.multiple(bruker, CACHE_KEY_FULL_BYTES=16, CACHE_KEY_SAMPLE_BYTES=4),
+        ):
+            d_folder = Path(temp_dir)
+            peak_data = d_folder / "analysis.tdf_bin"
+            peak_data.write_bytes(bytes(range(32)))
+            (d_folder / "analysis.tdf").write_bytes(bytes(32))
+            key = bruker._content_key(d_folder)
+            os.utime(peak_data, ns=(0, 0))
+            self.assertNotEqual(bruker._content_key(d_folder), key)
+            key = bruker._content_key(d_folder)
+            (d_folder / "analysis.tdf").write_bytes(bytes(16) + b"\x01" + bytes(15))
+            self.assertNotEqual(bruker._content_key(d_folder), key)
+            key = bruker._content_key(d_folder)
+            os.utime(d_folder / "analysis.tdf", ns=(0, 0))
+            self.assertEqual(bruker._content_key(d_folder), key)
+
+    def test_bin_peaks(self):
+        """Test merging peaks within the mass tolerance."""
+        mzs, intensities = bin_peaks(np.array([500.0, 200.0, 500.01, 200.001]), np.array([10, 20, 30, 20]))
+        np.testing.assert_allclose(mzs, [200.0005, 500.0075])
+        np.testing.assert_allclose(intensities, [40 / 30, 40 / 30])
+        mzs, intensities = bin_peaks(np.array([]), np.array([]))
+        self.assertEqual(mzs.size, 0)
+
+    def test_vectorized_binning_matches_masterspectrum(self):
+        """Test that the vectorized binning reproduces the results of MasterSpectrum."""
+        for seed in range(5):
+            mzs, intensities = _pasef_spectrum(seed)
+            expected_mzs, expected_intensities = bruker.binning(list(mzs), list(intensities), True)
+            binned_mzs, binned_intensities = bruker.binning(mzs, intensities, True, method="vectorized")
+            np.testing.assert_allclose(binned_mzs, expected_mzs, rtol=1e-6)
+            np.testing.assert_allclose(binned_intensities, expected_intensities, rtol=1e-9)
+
+    def test_bin_spectra(self):
+        """Test that binning a batch of spectra at once matches binning them one by one."""
+        spectra = [_pasef_spectrum(seed, n_fragments=5 + seed) for seed in range(5)]
+        spectra.insert(2, (np.array([]), np.array([])))
+        offsets = np.cumsum([0] + [len(mzs) for mzs, _ in spectra])
+        mzs, intensities, binned_offsets = bin_spectra(
+            np.concatenate([mzs for mzs, _ in spectra]), np.concatenate([ints for _, ints in spectra]), offsets
+        )
+        self.assertEqual(len(binned_offsets), len(spectra) + 1)
+        for i, (spectrum_mzs, spectrum_intensities) in enumerate(spectra):
+            expected_mzs, expected_intensities = bin_peaks(spectrum_mzs, spectrum_intensities)
+            np.testing.assert_allclose(mzs[binned_offsets[i] : binned_offsets[i + 1]], expected_mzs)
+            np.testing.assert_allclose(intensities[binned_offsets[i] : binned_offsets[i + 1]], expected_intensities)
+
+    def test_binning_by_charge(self):
+        """Test that binning by charge only merges peaks of the same charge and matches MasterSpectrum."""
+        mzs, intensities, charges = bruker.binning(
+            [200.0, 200.001, 200.0005, 300.0], [10, 10, 20, 20], False, method="vectorized", charges=[1, 2, 1, 2]
+        )
+        np.testing.assert_allclose(mzs, [200.000333333, 200.001, 300.0])
+        np.testing.assert_allclose(intensities, [1.5, 0.5, 1.0])
+        np.testing.assert_array_equal(charges, [1, 2, 2])
+        with self.assertRaises(ValueError):
+            bruker.binning([200.0], [10], False, method="vectorized")
+
+        rng = np.random.default_rng(0)
+        for seed in range(3):
+            mzs, intensities = _pasef_spectrum(seed)
+            charges = rng.integers(1, 4, mzs.size)
+            expected = bruker.binning(list(mzs), list(intensities), False, charges=list(charges))
+            binned = bruker.binning(mzs, intensities, False, method="vectorized", charges=charges)
+            np.testing.assert_allclose(binned[0], expected[0], rtol=1e-6)
+            np.testing.assert_allclose(binned[1], expected[1], rtol=1e-9)
+            np.testing.assert_array_equal(binned[2], expected[2])
+
+    def test_binning_method(self):
+        """Test that unsupported binning methods are rejected."""
+        with self.assertRaises(ValueError):
+            bruker.binning([100.0], [1], True, method="histogram")
+
+    def test_aggregate_timstof(self):
+        """Test aggregating spectra using both binning methods."""
+        spectra = [_pasef_spectrum(seed) for seed in range(3)]
+        raw_spectra = pd.DataFrame(
+            {"MZ": [list(mzs) for mzs, _ in spectra], "INTENSITIES": [list(ints) for _, ints in spectra]}
+        )
+        expected = bruker.aggregate_timstof(raw_spectra.copy())
+        aggregated = bruker.aggregate_timstof(raw_spectra.copy(), binning_method="vectorized")
+        for column in ["MZ", "INTENSITIES"]:
+            for binned, expected_binned in zip(aggregated[column], expected[column], strict=True):
+                np.testing.assert_allclose(binned, expected_binned, rtol=1e-6)
+
+    def test_aggregate_timstof_parallel(self):
+        """Test that binning spectra in parallel returns the same spectra in the same order."""
+        spectra = [_pasef_spectrum(seed, n_fragments=5 + seed) for seed in range(9)]
+        raw_spectra = pd.DataFrame(
+            {
+                "SCAN_NUMBER": range(len(spectra)),
+                "MZ": [list(mzs) for mzs, _ in spectra],
+                "INTENSITIES": [list(ints) for _, ints in spectra],
+            }
+        )
+        with config.config_context(max_workers=2):
+            for method in BINNING_METHODS:
+                expected = bruker.aggregate_timstof(raw_spectra.copy(), binning_method=method)
+                aggregated = bruker.aggregate_timstof(raw_spectra.copy(), binning_method=method, n_workers=2)
+                pd.testing.assert_series_equal(aggregated["SCAN_NUMBER"], expected["SCAN_NUMBER"])
+                for column in ["MZ", "INTENSITIES"]:
+                    for binned, expected_binned in zip(aggregated[column], expected[column], strict=True):
+                        np.testing.assert_allclose(binned, expected_binned)
+        parallel.shutdown_pool()
+
+    def test_aggregate_timstof_by_charge(self):
+        """Test aggregating spectra by charge in batches and in parallel."""
+        rng = np.random.default_rng(0)
+        spectra = [_pasef_spectrum(seed, n_fragments=5 + seed) for seed in range(6)]
+        raw_spectra = pd.DataFrame(
+            {
+                "MZ": [list(mzs) for mzs, _ in spectra],
+                "INTENSITIES": [list(ints) for _, ints in spectra],
+                "CHARGES": [list(rng.integers(1, 3, mzs.size)) for mzs, _ in spectra],
+            }
+        )
+        expected = [bruker.binning(mzs, ints, False, charges=charges) for mzs, ints, charges in raw_spectra.values]
+        with config.config_context(max_workers=2):
+            for n_workers in [1, 2]:
+                aggregated = bruker.aggregate_timstof(
+                    raw_spectra.copy(), binning_method="vectorized", n_workers=n_workers, ignore_charges=False
+                )
+                for i, column in enumerate(["MZ", "INTENSITIES", "CHARGES"]):
+                    for binned, expected_binned in zip(aggregated[column], expected, strict=True):
+                        np.testing.assert_allclose(binned, expected_binned[i], rtol=1e-6)
+        parallel.shutdown_pool()
+        with self.assertRaises(ValueError):
+            bruker.aggregate_timstof(raw_spectra.drop(columns="CHARGES"), ignore_charges=False)
+
+    def test_peak_slots(self):
+        """Test that peaks store their attributes in __slots__ instead of a per-instance __dict__."""
+        delta_function = _calculate_delta_by_ppm(40)
+        peak = Peak(100.0, 1.0, delta_function)
+        master_peak = MasterPeak(peak)
+        for cls, instance in [(Peak, peak), (MasterPeak, master_peak)]:
+            self.assertIn("__slots__", vars(cls))
+            self.assertFalse(hasattr(instance, "__dict__"))
+        with self.assertRaises(AttributeError):
+            peak.undeclared = 1
+
+    def test_master_peak_equality(self):
+        """Test comparing master peaks."""
+        delta_function = _calculate_delta_by_ppm(40)
+        master_peak = MasterPeak(Peak(100.0, 1.0, delta_function))
+        self.assertTrue(master_peak == MasterPeak(Peak(100.0, 0.5, delta_function)))
+        self.assertFalse(master_peak != MasterPeak(Peak(100.0, 1.0, delta_function)))
+        master_peak.add(Peak(100.001, 1.0, delta_function))
+        self.assertTrue(master_peak != MasterPeak(Peak(100.0, 1.0, delta_function)))
+        self.assertEqual(master_peak.meta, [])
+
+    def test_batch_labels(self):
+        """Test splitting the scan to precursor map into batches of frames without splitting aggregated rows."""
+        scan_to_precursor_map = pd.DataFrame(
+            {
+                "SCAN_NUMBER": [1, 1, 2, 3, 4, 5, 5],
+                "PRECURSOR": [10, 10, 11, 12, 11, 13, 14],
+                "FRAME": [2, 3, 2, 4, 6, 7, 8],
+            }
+        )
+        labels = bruker._batch_labels(scan_to_precursor_map, frames_per_batch=2)
+        np.testing.assert_array_equal(labels, [0, 0, 1, 2, 1, 3, 3])
+        labels = bruker._batch_labels(scan_to_precursor_map, frames_per_batch=100)
+        np.testing.assert_array_equal(labels, np.zeros(7))
+        self.assertEqual(bruker._batch_labels(scan_to_precursor_map.iloc[:0], frames_per_batch=2).size, 0)
+
+    def test_iter_timstof(self):
+        """Test that reading spectra in batches of frames yields the same spectra as reading all frames at once."""
+        data, scan_to_precursor_map = _fake_timstof()
+        with patch("alphatims.bruker.TimsTOF", return_value=data):
+            batches = list(bruker.iter_timstof("run.hdf", scan_to_precursor_map, frames_per_batch=4))
+            batched = bruker.read_timstof("run.hdf", scan_to_precursor_map, frames_per_batch=4)
+            whole = bruker.read_timstof("run.hdf", scan_to_precursor_map, frames_per_batch=100)
+        self.assertEqual([len(batch) for batch in batches], [2, 2, 2])
+        self.assertEqual(whole["SCAN_NUMBER"].tolist(), list(range(6)))
+        pd.testing.assert_frame_equal(batched, whole)
+
+    def test_aggregate_raw_indices(self):
+        """Test aggregating raw peaks within the scan windows of their frame and precursor to flat spectra."""
+        peaks = pd.DataFrame(
+            {
+                "FRAME": [1, 1, 1, 2, 2, 3],
+                "SCAN": [5, 9, 6, 5, 7, 5],
+                "PRECURSOR": [1, 1, 2, 1, 2, 3],
+                "RETENTION_TIME": [60.0, 60.0, 60.0, 120.0, 120.0, 180.0],
+                "INV_ION_MOBILITY": [1.0, 0.9, 1.1, 1.2, 0.8, 1.0],
+                "MZ": [100.0, 200.0, 300.0, 400.0, 500.0, 600.0],
+                "INTENSITIES": [1.0, 2.0, 3.0, 4.0, 5.0, 6.0],
+            }
+        )
+        scan_to_precursor_map = pd.DataFrame(
+            {
+                "SCAN_NUMBER": [7, 7, 3, 8],
+                "PRECURSOR": [1, 1, 2, 3],
+                "FRAME": [1, 2, 1, 3],
+                "SCAN_NUM_BEGIN": [4, 4, 4, 8],
+                "SCAN_NUM_END": [8, 8, 8, 9],
+                "COLLISION_ENERGY": [20.0, 30.0, 25.0, 25.0],
+            }
+        )
+        data = _FakeTimsTOF(peaks)
+        spectra, mzs, intensities, offsets = bruker.aggregate_raw_indices(data, np.arange(6), scan_to_precursor_map)
+        self.assertEqual(spectra["SCAN_NUMBER"].tolist(), [3, 7])
+        np.testing.assert_allclose(spectra["COLLISION_ENERGY"], [25.0, 25.0])
+        np.testing.assert_allclose(spectra["RETENTION_TIME"], [1.0, 1.5])
+        np.testing.assert_allclose(spectra["median_INV_ION_MOBILITY"], [1.1, 1.1])
+        np.testing.assert_array_equal(offsets, [0, 1, 3])
+        np.testing.assert_array_equal(mzs, [300.0, 100.0, 400.0])
+        np.testing.assert_array_equal(intensities, [3.0, 1.0, 4.0])
+
+        spectra, mzs, _, offsets, mobilities = bruker.aggregate_raw_indices(
+            data, np.arange(6), scan_to_precursor_map, keep_mobility=True, mobility_window=0.3
+        )
+        self.assertEqual(spectra["SCAN_NUMBER"].tolist(), [3, 7, 7])
+        np.testing.assert_allclose(spectra["INV_ION_MOBILITY_WINDOW"], [0.9, 0.9, 1.2])
+        np.testing.assert_allclose(spectra["COLLISION_ENERGY"], [25.0, 20.0, 30.0])
+        np.testing.assert_allclose(spectra["RETENTION_TIME"], [1.0, 1.0, 2.0])
+        np.testing.assert_array_equal(offsets, [0, 1, 2, 3])
+        np.testing.assert_array_equal(mzs, [300.0, 100.0, 400.0])
+        np.testing.assert_array_equal(mobilities, [1.1, 1.0, 1.2])
+
+    def test_read_timstof_mobility(self):
+        """Test keeping per-peak mobilities aligned with the peaks of the spectra read in batches."""
+        data, scan_to_precursor_map = _fake_timstof()
+        with patch("alphatims.bruker.TimsTOF", return_value=data):
+            spectra = bruker.read_timstof("run.hdf", scan_to_precursor_map, frames_per_batch=4, keep_mobility=True)
+            windows = bruker.read_timstof("run.hdf", scan_to_precursor_map, frames_per_batch=4, mobility_window=0.5)
+        self.assertEqual(spectra.columns[2:5].tolist(), ["INTENSITIES", "MZ", "INV_ION_MOBILITY"])
+        for mzs, mobilities in zip(spectra["MZ"], spectra["INV_ION_MOBILITY"], strict=True):
+            self.assertEqual(len(mzs), len(mobilities))
+        self.assertEqual(windows["INV_ION_MOBILITY_WINDOW"].tolist(), [1.0] * 6)
+        pd.testing.assert_series_equal(windows["MZ"].map(len), spectra["MZ"].map(len))
+
+    def test_invalid_mobility_window(self):
+        """Test that mobility windows without a positive width are rejected before reading any data."""
+        data, scan_to_precursor_map = _fake_timstof()
+        with patch("alphatims.bruker.TimsTOF", return_value=data) as timstof:
+            for mobility_window in [0, -0.1, float("nan")]:
+                with self.assertRaises(ValueError):
+                    bruker.read_timstof("run.hdf", scan_to_precursor_map, mobility_window=mobility_window)
+                with self.assertRaises(ValueError):
+                    bruker.read_and_aggregate_timstof("run.hdf", "meta.csv", mobility_window=mobility_window)
+                with self.assertRaises(ValueError):
+                    bruker.aggregate_raw_indices(
+                        data, np.arange(3), scan_to_precursor_map, mobility_window=mobility_window
+                    )
+        timstof.assert_not_called()
+
+    def test_read_and_aggregate_timstof_runs(self):
+        """Test aggregating several runs in parallel, writing one Parquet file per run and skipping existing ones."""
+        data, scan_to_precursor_map = _fake_timstof()
+        with tempfile.TemporaryDirectory() as temp_dir, patch("alphatims.bruker.TimsTOF", return_value=data):
+            tims_meta_file = Path(temp_dir) / "meta.csv"
+            scan_to_precursor_map.to_csv(tims_meta_file, index=False)
+            runs = [(f"run_{i}.d", tims_meta_file) for i in range(3)]
+            output_dir = Path(temp_dir) / "spectra"
+            expected = bruker.read_and_aggregate_timstof("run_0.d", tims_meta_file)
+            # workers are forked after patching, so they read the fake data as well
+            with patch.object(config, "_config", config.get_config()):
+                parallel.configure_pool(max_workers=2, start_method="fork")
+                self.addCleanup(parallel.configure_pool)
+                output_files = bruker.read_and_aggregate_timstof_runs(runs, output_dir, n_workers=2)
+            self.assertEqual(output_files, [output_dir / f"run_{i}.parquet" for i in range(3)])
+            spectra = pd.read_parquet(output_files[0])
+            self.assertTrue(pa.types.is_large_list(pq.read_schema(output_files[0]).field("MZ").type))
+            self.assertEqual(spectra["SCAN_NUMBER"].tolist(), expected["SCAN_NUMBER"].tolist())
+            for mzs, expected_mzs in zip(spectra["MZ"], expected["MZ"], strict=True):
+                np.testing.assert_allclose(mzs, expected_mzs)
+            self.assertEqual(pd.read_parquet(output_files[2])["RAW_FILE"].unique().tolist(), ["run_2"])
+
+            output_files[1].unlink()
+            with patch.object(bruker, "read_and_aggregate_timstof", return_value=expected) as read:
+                bruker.read_and_aggregate_timstof_runs(runs, output_dir, n_workers=1)
+            read.assert_called_once()
+            self.assertEqual(sorted(path.name for path in output_dir.iterdir()), [f"run_{i}.parquet" for i in range(3)])
+            with self.assertRaises(ValueError):
+                bruker.read_and_aggregate_timstof_runs([*runs, ("other/run_0.hdf", tims_meta_file)], output_dir)
@@ -0,0 +1,91 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import pandas as pd
+
+from spectrum_io import config, parallel
+from spectrum_io.file import csv, parquet
+
+
+def _worker_config(_) -> tuple[int | None, int]:
+    worker_config = config.get_config()
+    return worker_config.max_workers, worker_config.max_batch_bytes
+
+
+class TestConfig(unittest.TestCase):
+    """Test class to check the global resource configuration."""
+
+    def test_parse_bytes(self):
+        """Check parsing of byte sizes with and without units."""
+        self.assertEqual(config.parse_bytes(1024), 1024)
+        self.assertEqual(config.parse_bytes("1024"), 1024)
+        self.assertEqual(config.parse_bytes("512M"), 512 * 1024**2)
+        self.assertEqual(config.parse_bytes("2GiB"), 2 * 1024**3)
+        self.assertEqual(config.parse_bytes("4 kb"), 4096)
+        with self.assertRaises(ValueError):
+            config.parse_bytes("a lot")
+
+    def test_from_env(self):
+        """Check that settings are read from environment variables."""
+        env = {"SPECTRUM_IO_MAX_WORKERS": "3", "SPECTRUM_IO_MAX_BATCH_BYTES": "1G", "SPECTRUM_IO_TEMP_DIR": "/scratch"}
+        with patch.dict(os.environ, env):
+            env_config = config.Config.from_env()
+        self.assertEqual(env_config.max_workers, 3)
+        self.assertEqual(env_config.max_batch_bytes, 1024**3)
+        self.assertEqual(env_config.temp_dir, Path("/scratch"))
+
+    def test_config_context(self):
+        """Check that settings are changed within the context and restored afterwards."""
+        previous = config.get_config()
+        with config.config_context(max_workers=2, max_batch_bytes="1M") as changed:
+            self.assertIs(config.get_config(), changed)
+            self.assertEqual(changed.workers, 2)
+            self.assertEqual(changed.max_batch_bytes, 1024**2)
+        self.assertIs(config.get_config(), previous)
+        with self.assertRaises(TypeError):
+            config.set_config(workers=2)
+        with self.assertRaises(ValueError):
+            config.set_config(max_workers=0)
+
+    def test_batch_rows(self):
+        """Check that batch sizes are derived from the memory budget."""
+        budget = config.Config(max_batch_bytes=1000)
+        self.assertEqual(budget.batch_rows(10), 100)
+        self.assertEqual(budget.batch_rows(10, in_flight=4), 25)
+        self.assertEqual(budget.batch_rows(10_000), 1)
+
+    def test_temp_dir(self):
+        """Check that the temp directory is created on demand."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            temp_dir = Path(tmpdir) / "spectrum_io"
+            with config.config_context(temp_dir=temp_dir):
+                self.assertEqual(config.get_config().get_temp_dir(), temp_dir)
+            self.assertTrue(temp_dir.is_dir())
+
+    def test_streaming_honors_batch_bytes(self):
+        """Check that streaming readers split files into batches within the memory budget."""
+        df = pd.DataFrame({"SCAN_NUMBER": range(1000), "SCORE": [0.5] * 1000})
+        with tempfile.TemporaryDirectory() as tmpdir:
+            csv.write_file(df, Path(tmpdir) / "data.csv")
+            parquet.write_file(df, Path(tmpdir) / "data.parquet")
+            with config.config_context(max_batch_bytes=4096):
+                csv_batches = list(csv.iter_file(Path(tmpdir) / "data.csv"))
+                parquet_batches = list(parquet.iter_batches(Path(tmpdir) / "data.parquet"))
+        for batches in (csv_batches, parquet_batches):
+            self.assertGreater(len(batches), 1)
+            self.assertTrue(all(batch.memory_usage(index=False, deep=True).sum() <= 4096 for batch in batches))
+            pd.testing.assert_frame_equal(pd.concat(batches, ignore_index=True), df)
+
+    def test_pool_honors_config(self):
+        """Check that the worker pool follows max_workers and passes the configuration on to its workers."""
+        with config.config_context(max_workers=1, max_batch_bytes="1M"):
+            pool = parallel.get_pool()
+            self.assertEqual(pool._max_workers, 1)
+            self.assertEqual(list(parallel.parallel_map(_worker_config, range(2))), [(1, 1024**2)] * 2)
+            with config.config_context(max_workers=2):
+                self.assertIsNot(parallel.get_pool(), pool)
+                self.assertEqual(parallel.get_pool()._max_workers, 2)
+        parallel.shutdown_pool()
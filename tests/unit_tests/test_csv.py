@@ -0,0 +1,73 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+import pandas as pd
+
+from spectrum_io.file import csv
+
+
+class TestCsv(unittest.TestCase):
+    """Test class to check csv file I/O."""
+
+    @classmethod
+    def setUpClass(cls):  # noqa: D102
+        cls.df = pd.DataFrame(
+            {
+                "RAW_FILE": ["run_1", "run_1", "run_2"],
+                "SCAN_NUMBER": [1, 234, 5678],
+                "MODIFIED_SEQUENCE": ["SVFLTFLR", "KTSQIFLAK", "SPVGRVTPKEWR"],
+                "REVERSE": [False, True, False],
+                "SCORE": [12.5, 3.25, 100.0],
+            }
+        )
+        cls.temp_dir = Path(tempfile.mkdtemp())
+
+    @classmethod
+    def tearDownClass(cls):  # noqa: D102
+        shutil.rmtree(cls.temp_dir)
+
+    def test_read_write_file(self):
+        """Check whether data is unmodified after being written and read again with both engines."""
+        for engine in csv.ENGINES:
+            output_path = self.temp_dir / f"table_{engine}.csv"
+            csv.write_file(self.df, output_path, engine=engine)
+            for read_engine in csv.ENGINES:
+                pd.testing.assert_frame_equal(csv.read_file(output_path, engine=read_engine), self.df)
+
+    def test_read_write_missing_strings(self):
+        """Check that missing values in columns read as str remain missing with the default engine."""
+        df = self.df.assign(PROTEINS=["P1", None, "P2;P3"], RAW_FILE=["007", "007", "8"])
+        output_path = self.temp_dir / "table_missing.csv"
+        csv.write_file(df, output_path)
+        read_df = csv.read_file(output_path, dtype={"PROTEINS": str, "RAW_FILE": str})
+        self.assertEqual(read_df["RAW_FILE"].tolist(), ["007", "007", "8"])
+        self.assertEqual(read_df["PROTEINS"].isna().tolist(), [False, True, False])
+
+    def test_write_file_default(self):
+        """Check that the default writer produces the same output as pandas, including columns of lists."""
+        df = self.df.assign(PROTEINS=[["P1"], ["P2", "P3"], []])
+        output_path = self.temp_dir / "table_default.csv"
+        csv.write_file(df, output_path)
+        self.assertEqual(output_path.read_text(), df.to_csv(index=False))
+
+    def test_read_file_usecols_dtype(self):
+        """Check that only the requested columns are read using the provided dtypes."""
+        output_path = self.temp_dir / "table.csv"
+        csv.write_file(self.df, output_path)
+        df = csv.read_file(output_path, usecols=["SCAN_NUMBER", "SCORE"], dtype={"SCAN_NUMBER": "float64"})
+        pd.testing.assert_frame_equal(df, self.df[["SCAN_NUMBER", "SCORE"]].astype({"SCAN_NUMBER": "float64"}))
+
+    def test_iter_file(self):
+        """Check that chunked reading yields all rows in chunks of the requested size."""
+        output_path = self.temp_dir / "table.csv"
+        csv.write_file(self.df, output_path)
+        chunks = list(csv.iter_file(output_path, chunksize=2))
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 1])
+        pd.testing.assert_frame_equal(pd.concat(chunks), self.df)
+
+    def test_invalid_engine(self):
+        """Check that unsupported engines are rejected."""
+        with self.assertRaises(ValueError):
+            csv.read_file(self.temp_dir / "table.csv", engine="python")
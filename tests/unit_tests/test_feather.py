@@ -0,0 +1,63 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from spectrum_io.file import feather
+
+
+class TestFeather(unittest.TestCase):
+    """Test class to check Feather (Arrow IPC) file I/O."""
+
+    @classmethod
+    def setUpClass(cls):  # noqa: D102
+        cls.df = pd.DataFrame(
+            {
+                "RAW_FILE": ["run_1", "run_1", "run_2"],
+                "SCAN_NUMBER": [1, 234, 5678],
+                "SCORE": [12.5, 3.25, 100.0],
+            }
+        )
+        cls.temp_dir = Path(tempfile.mkdtemp())
+
+    @classmethod
+    def tearDownClass(cls):  # noqa: D102
+        shutil.rmtree(cls.temp_dir)
+
+    def test_read_write_file(self):
+        """Check whether data is unmodified after being written and read again, with and without compression."""
+        for compression in [None, "zstd"]:
+            output_path = self.temp_dir / f"table_{compression}.arrow"
+            feather.write_file(self.df, output_path, compression=compression)
+            for memory_map in [True, False]:
+                pd.testing.assert_frame_equal(feather.read_file(output_path, memory_map=memory_map), self.df)
+            pd.testing.assert_frame_equal(feather.read_file(output_path, columns=["SCORE"]), self.df[["SCORE"]])
+
+    def test_read_table_zero_copy(self):
+        """Check that memory-mapped reads of uncompressed files do not allocate memory for the data."""
+        output_path = self.temp_dir / "large.arrow"
+        feather.write_file(pd.DataFrame({"INTENSITY": np.arange(1_000_000, dtype=np.float64)}), output_path)
+        allocated_before = pa.total_allocated_bytes()
+        table = feather.read_table(output_path)
+        self.assertEqual(pa.total_allocated_bytes(), allocated_before)
+        self.assertEqual(table.column("INTENSITY")[999_999].as_py(), 999_999.0)
+
+    def test_read_write_spectra(self):
+        """Check that spectra given as flat buffers are unmodified after being written and read again."""
+        output_path = self.temp_dir / "spectra.arrow"
+        metadata = pd.DataFrame({"SCAN_NUMBER": [1, 2, 3]})
+        mzs = np.array([100.1, 200.2, 300.3, 150.5, 250.5, 400.0])
+        intensities = np.array([1.0, 0.5, 0.25, 1.0, 0.1, 1.0], dtype=np.float32)
+        offsets = np.array([0, 3, 5, 6])
+        feather.write_spectra(metadata, mzs, intensities, offsets, output_path)
+
+        read_metadata, read_mzs, read_intensities, read_offsets = feather.read_spectra(output_path)
+        pd.testing.assert_frame_equal(read_metadata, metadata)
+        np.testing.assert_array_equal(read_mzs, mzs)
+        np.testing.assert_array_equal(read_intensities, intensities)
+        np.testing.assert_array_equal(read_offsets, offsets)
+        self.assertFalse(read_mzs.flags.writeable)
@@ -0,0 +1,75 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+import h5py
+import numpy as np
+import pandas as pd
+import scipy
+
+from spectrum_io.file import hdf5
+
+try:
+    import tables  # noqa: F401
+
+    HAS_PYTABLES = True
+except ImportError:
+    HAS_PYTABLES = False
+
+
+class TestHdf5Catalog(unittest.TestCase):
+    """Test class to check the metadata catalog of hdf5 files."""
+
+    @classmethod
+    def setUpClass(cls):  # noqa: D102
+        cls.temp_dir = Path(tempfile.mkdtemp())
+        cls.matrix = scipy.sparse.csr_matrix(np.array([[0.0, 1.0, 0.0], [0.5, 0.0, 0.25]]))
+        cls.df = pd.DataFrame({"SCAN_NUMBER": [1, 2], "SEQUENCE": ["PEPTIDE", "PEPTIDEK"], "SCORE": [1.5, 2.0]})
+
+    @classmethod
+    def tearDownClass(cls):  # noqa: D102
+        shutil.rmtree(cls.temp_dir)
+
+    def test_sparse_summary(self):
+        """Check that the summary of a sparse matrix is stored and inferred without summary attribute."""
+        path = self.temp_dir / "sparse.hdf5"
+        hdf5.write_dataset(self.matrix, path, "intensities", column_names=["a", "b", "c"])
+        expected = {
+            "kind": "sparse",
+            "n_rows": 2,
+            "n_columns": 3,
+            "nnz": 3,
+            "columns": ["a", "b", "c"],
+            "dtypes": {"values": "float64"},
+        }
+        self.assertEqual(hdf5.list_datasets(path), ["sparse_intensities"])
+        self.assertEqual(hdf5.read_summary(path, "sparse_intensities"), expected)
+
+        with h5py.File(path, "a") as f:
+            del f["sparse_intensities"].attrs[hdf5.SUMMARY_ATTR]
+        self.assertEqual(hdf5.read_summary(path, "sparse_intensities"), expected)
+
+    def test_sparse_summary_dtype(self):
+        """Check that the summary records the dtype the values are stored with, not the dtype of the input."""
+        path = self.temp_dir / "sparse_int.hdf5"
+        hdf5.write_dataset(self.matrix.astype(np.int64), path, "counts")
+        self.assertEqual(hdf5.read_summary(path, "sparse_counts")["dtypes"], {"values": "float64"})
+
+    @unittest.skipUnless(HAS_PYTABLES, "writing DataFrames to hdf5 requires pytables")
+    def test_read_catalog(self):
+        """Check that the catalog lists all datasets with their shapes, columns and dtypes."""
+        path = self.temp_dir / "catalog.hdf5"
+        hdf5.write_dataset(self.df, path, "meta_data")
+        hdf5.write_dataset(self.matrix, path, "intensities", mode="a", column_names=["a", "b", "c"])
+        self.df.to_hdf(path, key="no_summary", mode="a")
+
+        catalog = hdf5.read_catalog(path).set_index("key")
+        self.assertEqual(list(catalog.columns), hdf5.CATALOG_COLUMNS[1:])
+        self.assertEqual(sorted(catalog.index), ["meta_data", "no_summary", "sparse_intensities"])
+        for key in ["meta_data", "no_summary"]:
+            self.assertEqual(catalog.loc[key, "kind"], "frame")
+            self.assertEqual(catalog.loc[key, "n_rows"], 2)
+            self.assertEqual(catalog.loc[key, "columns"], ["SCAN_NUMBER", "SEQUENCE", "SCORE"])
+            self.assertEqual(catalog.loc[key, "dtypes"]["SCAN_NUMBER"], "int64")
+        self.assertEqual(catalog.loc["sparse_intensities", "nnz"], 3)
@@ -0,0 +1,88 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from spectrum_io import instrumentation
+from spectrum_io.raw.msraw import MSRaw
+from spectrum_io.search_result import Sage
+from spectrum_io.spectral_library import MSP
+
+
+class TestInstrumentation(unittest.TestCase):
+    """Test class to check the I/O instrumentation."""
+
+    def setUp(self):  # noqa: D102
+        self.events = []
+        instrumentation.enable(self.events.append)
+
+    def tearDown(self):  # noqa: D102
+        instrumentation.disable()
+
+    def test_disabled(self):
+        """Check that no events are emitted while instrumentation is disabled."""
+        instrumentation.disable()
+        with instrumentation.measure("test") as measurement:
+            measurement.add(rows=1)
+        self.assertEqual(self.events, [])
+        self.assertEqual(measurement.counters, {})
+
+    def test_measure(self):
+        """Check that counters are accumulated and emitted together with the duration."""
+        with instrumentation.measure("test", path=Path("a")) as measurement:
+            measurement.add(rows=2, peaks=10)
+            measurement.add(rows=3)
+        self.assertEqual(len(self.events), 1)
+        event = self.events[0]
+        self.assertEqual(event["operation"], "test")
+        self.assertEqual(event["path"], "a")
+        self.assertEqual((event["rows"], event["peaks"]), (5, 10))
+        self.assertGreaterEqual(event["duration_s"], 0)
+
+    def test_read_mzml(self):
+        """Check that reading mzml files reports bytes read, spectra and peaks."""
+        source = Path(__file__).parent / "data" / "test.mzml"
+        df = MSRaw.read_mzml(source, package="pyteomics")
+        event = self.events[-1]
+        self.assertEqual(event["operation"], "raw.read_mzml")
+        self.assertEqual(event["bytes_read"], source.stat().st_size)
+        self.assertEqual(event["spectra"], len(df))
+        self.assertEqual(event["peaks"], df["INTENSITIES"].map(len).sum())
+
+    def test_read_result(self):
+        """Check that reading search results reports bytes read and rows."""
+        source = Path(__file__).parent / "data" / "sage_output.tsv"
+        df = Sage(source).read_result()
+        event = self.events[-1]
+        self.assertEqual(event["operation"], "search_result.Sage.read_result")
+        self.assertEqual(event["bytes_read"], source.stat().st_size)
+        self.assertEqual(event["rows"], len(df))
+
+    def test_spectral_library_write(self):
+        """Check that writing a spectral library reports spectra, peaks and bytes written."""
+        data = {
+            "intensities": np.array([[1e-5, 0.2, 0.3, 0.8], [-1, 0.5, 0.6, 0.001]]),
+            "mz": np.array([[0.9, 0.8, -1, 0.3], [0.6, 0.5, 0.4, 0.3]]),
+            "annotation": np.array([[b"y1+1", b"b1+1", b"y2+2", b"b2+2"], [b"y1+1", b"b1+1", b"y2+2", b"b2+2"]]),
+            "irt": np.array([[982.12], [382.12]]),
+        }
+        metadata = pd.DataFrame(
+            {
+                "SEQUENCE": ["AAACCCCKR", "AAACILKKR"],
+                "MODIFIED_SEQUENCE": ["AAAC[UNIMOD:4]CC[UNIMOD:4]CKR", "AAACILKKR"],
+                "PRECURSOR_CHARGE": [1, 2],
+                "MASS": [123.4, 3232.1],
+                "COLLISION_ENERGY": [10.0, 20.0],
+                "PROTEINS": ["ProteinA", "ProteinB"],
+            }
+        )
+        with tempfile.TemporaryDirectory() as temp_dir:
+            out_file = Path(temp_dir) / "test.msp"
+            MSP(out_file).write(data=data, metadata=metadata)
+            event = self.events[-1]
+            self.assertEqual(event["operation"], "spectral_library.write")
+            self.assertEqual(event["format"], "MSP")
+            self.assertEqual((event["spectra"], event["peaks"]), (2, 5))
+            self.assertEqual(event["bytes_written"], out_file.stat().st_size)
@@ -0,0 +1,74 @@
+import subprocess
+import sys
+import unittest
+
+HEAVY_MODULES = ["alphatims", "h5py", "pyarrow", "pymzml", "pyteomics", "pyopenms"]
+
+
+def _import_time_us(module: str) -> int:
+    """Cumulative import time of a module in microseconds as reported by python -X importtime."""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"], capture_output=True, text=True, check=True
+    ).stderr
+    for line in stderr.splitlines():
+        _, _, cumulative, name = (part.strip() for part in line.replace(":", "|", 1).split("|"))
+        if name == module:
+            return int(cumulative)
+    raise AssertionError(f"{module} not found in import time report")
+
+
+def _loaded_modules(code: str) -> set[str]:
+    """Top level modules loaded by running the given code in a fresh interpreter, excluding those loaded at startup."""
+
+    def loaded(code: str) -> set[str]:
+        stdout = subprocess.run(
+            [sys.executable, "-c", f"{code}\nimport sys\nprint(' '.join(sys.modules))"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        return {name.split(".")[0] for name in stdout.split()}
+
+    return loaded(code) - loaded("pass")
+
+
+class TestLazyImports(unittest.TestCase):
+    """Test class to check that subpackages and heavy dependencies are imported on demand."""
+
+    def test_import_spectrum_io(self):
+        """Check that importing spectrum_io does not import any heavy backend."""
+        loaded = _loaded_modules("import spectrum_io")
+        self.assertFalse(loaded & set(HEAVY_MODULES), f"{sorted(loaded & set(HEAVY_MODULES))} imported eagerly")
+
+    def test_import_spectral_library(self):
+        """Check that writing spectral libraries does not import the raw file and search engine backends."""
+        loaded = _loaded_modules("from spectrum_io.spectral_library import MSP")
+        self.assertFalse(loaded & {"alphatims", "h5py", "pymzml", "pyteomics", "pyopenms"})
+
+    def test_import_search_result(self):
+        """Check that importing a single search engine does not import the others' backends."""
+        loaded = _loaded_modules("from spectrum_io.search_result import MaxQuant")
+        self.assertNotIn("pyopenms", loaded)
+        self.assertNotIn("pyteomics", loaded)
+
+    def test_attribute_access(self):
+        """Check that lazily imported attributes resolve to the objects defined in the submodules."""
+        import spectrum_io
+        from spectrum_io.file.table import open_table
+        from spectrum_io.search_result.sage import Sage
+
+        self.assertIs(spectrum_io.file.open_table, open_table)
+        self.assertIs(spectrum_io.search_result.Sage, Sage)
+        self.assertIn("parquet", dir(spectrum_io.file))
+        with self.assertRaises(AttributeError):
+            spectrum_io.search_result.Comet  # noqa: B018
+
+    def test_import_time(self):
+        """Benchmark the import time of spectrum_io, which must be a small fraction of importing a backend."""
+        package = _import_time_us("spectrum_io")
+        backend = _import_time_us("spectrum_io.d.bruker")
+        self.assertLess(
+            package,
+            backend / 5,
+            f"import spectrum_io: {package / 1000:.1f} ms, import spectrum_io.d.bruker: {backend / 1000:.1f} ms",
+        )
@@ -1,5 +1,8 @@
+import shutil
+import tempfile
 import unittest
 from pathlib import Path
+from unittest.mock import patch
 
 import pandas as pd
 
@@ -69,3 +72,20 @@ class TestMaxQuant(unittest.TestCase):
         expected_df = pd.read_csv(expected_df_path)
 
         pd.testing.assert_frame_equal(internal_search_results_df[COLUMNS], expected_df[COLUMNS])
+
+    def test_generate_internal_cache_in_txt_folder(self):
+        """Test that a cache written into the txt folder is reused and unrelated files do not invalidate it."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            txt_folder = Path(temp_dir)
+            shutil.copy(Path(__file__).parent / "data" / "msms.txt", txt_folder / "msms.txt")
+            out_path = txt_folder / "msms.prosit"
+            maxquant = MaxQuant(txt_folder)
+            with patch.object(MaxQuant, "read_result", wraps=maxquant.read_result) as read_result:
+                for _ in range(3):
+                    maxquant.generate_internal(out_path=out_path)
+                (txt_folder / "evidence.txt").write_text("unrelated")
+                maxquant.generate_internal(out_path=out_path)
+                self.assertEqual(read_result.call_count, 1)
+                (txt_folder / "msms.txt").write_text((txt_folder / "msms.txt").read_text().replace("\n", "\r\n", 1))
+                maxquant.generate_internal(out_path=out_path)
+                self.assertEqual(read_result.call_count, 2)
@@ -1,3 +1,4 @@
+import tempfile
 import unittest
 from pathlib import Path
 
@@ -41,14 +42,13 @@ class TestOpenMS(unittest.TestCase):
     def test_read_openms(self):
         """Test function for reading OpenMS results and transforming to Prosit format."""
         expected_openms_internal_path = Path(__file__).parent / "data" / "openms.csv"
-        OpenMS(Path(__file__).parent / "data" / "openms.idXML").generate_internal(
-            out_path=Path(__file__).parent / "data" / "openms.csv"
-        )
-
-        internal_search_results_df = (
-            OpenMS(Path(__file__).parent / "data" / "openms.idXML").read_result().reset_index(drop=True)
-        )
+        with tempfile.TemporaryDirectory() as temp_dir:
+            out_path = Path(temp_dir) / "openms.csv"
+            internal_search_results_df = OpenMS(Path(__file__).parent / "data" / "openms.idXML").generate_internal(
+                out_path=out_path
+            )
+            self.assertTrue(out_path.is_file())
 
         expected_df = pd.read_csv(expected_openms_internal_path)
 
-        pd.testing.assert_frame_equal(internal_search_results_df[COLUMNS], expected_df[COLUMNS])
+        pd.testing.assert_frame_equal(internal_search_results_df.reset_index(drop=True)[COLUMNS], expected_df[COLUMNS])
@@ -0,0 +1,86 @@
+import os
+import unittest
+from concurrent.futures.process import BrokenProcessPool
+from unittest.mock import patch
+
+from spectrum_io import config, parallel
+
+
+def _square(x: int) -> int:
+    return x * x
+
+
+def _pid(_) -> int:
+    return os.getpid()
+
+
+def _crash():
+    os._exit(1)
+
+
+class TestParallel(unittest.TestCase):
+    """Test class to check the shared worker pool."""
+
+    def setUp(self):  # noqa: D102
+        # restore the global configuration changed by the tests afterwards
+        patcher = patch.object(config, "_config", config.get_config())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        parallel.configure_pool(max_workers=2)
+
+    def tearDown(self):  # noqa: D102
+        parallel.configure_pool()
+
+    def test_parallel_map(self):
+        """Check that results are returned in order."""
+        self.assertEqual(list(parallel.parallel_map(_square, range(10))), [x * x for x in range(10)])
+
+    def test_parallel_map_in_flight(self):
+        """Check that the iterable is only consumed as far as the elements in flight."""
+        consumed = []
+
+        def arguments():
+            for x in range(10):
+                consumed.append(x)
+                yield x
+
+        results = parallel.parallel_map(_square, arguments(), max_in_flight=3)
+        self.assertEqual(next(results), 0)
+        self.assertEqual(len(consumed), 4)
+        self.assertEqual(list(results), [x * x for x in range(1, 10)])
+
+    def test_submit_broken_pool(self):
+        """Check that a pool broken by a crashed worker is replaced on the next submission."""
+        pool = parallel.get_pool()
+        with self.assertRaises(BrokenProcessPool):
+            parallel.submit(_crash).result()
+        self.assertEqual(parallel.submit(_square, 3).result(), 9)
+        self.assertIsNot(parallel.get_pool(), pool)
+
+    def test_pool_is_reused(self):
+        """Check that repeated calls use the same pool and worker processes."""
+        pool = parallel.get_pool()
+        pids = set(parallel.parallel_map(_pid, range(8)))
+        self.assertIs(parallel.get_pool(), pool)
+        self.assertTrue(set(parallel.parallel_map(_pid, range(8))) <= pids | set(pool._processes))
+        self.assertNotIn(os.getpid(), pids)
+
+    def test_configure_pool(self):
+        """Check that configuring the pool replaces a running pool."""
+        pool = parallel.get_pool()
+        parallel.configure_pool(max_workers=1)
+        self.assertEqual(parallel.get_max_workers(), 1)
+        self.assertIsNot(parallel.get_pool(), pool)
+        parallel.configure_pool(start_method="spawn")
+        self.assertEqual(parallel.get_max_workers(), 1)
+        with self.assertRaises(ValueError):
+            parallel.configure_pool(max_workers=0)
+        with self.assertRaises(ValueError):
+            parallel.configure_pool(start_method="threads")
+
+    def test_pool_after_fork(self):
+        """Check that a pool inherited from another process is replaced instead of reused."""
+        pool = parallel.get_pool()
+        parallel._pool_pid = -1
+        self.assertIsNot(parallel.get_pool(), pool)
+        pool.shutdown()
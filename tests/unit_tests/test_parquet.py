@@ -4,6 +4,7 @@ import tempfile
 import unittest
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 import pyarrow as pa
 import pyarrow.parquet as pq
@@ -79,3 +80,93 @@ class TestParquet(unittest.TestCase):
         parquet.write_partition([df, df, df], output_path, ["1", "2", "3"])
         read_df = parquet.read_partition(output_path, "2")
         pd.testing.assert_frame_equal(read_df, df)
+
+    def test_read_file_columns_filters(self):
+        """Check that column projection and row filters are applied when reading a single dataset."""
+        output_path = self.temp_dir / "table.parquet"
+        pq.write_table(pa.Table.from_pydict(self.raw_data), output_path)
+        df = parquet.read_file(output_path, columns=["scan_number", "sequence"], filters=[("scan_number", ">", 1)])
+        expected_df = pd.DataFrame(self.raw_data)[["scan_number", "sequence"]].iloc[1:].reset_index(drop=True)
+        pd.testing.assert_frame_equal(df, expected_df)
+
+    def test_iter_batches(self):
+        """Check that batched reading yields all matching rows in order and respects the batch size."""
+        output_path = self.temp_dir / "table.parquet"
+        pq.write_table(pa.Table.from_pydict(self.raw_data), output_path)
+        batches = list(parquet.iter_batches(output_path, batch_size=2))
+        self.assertTrue(all(len(batch) <= 2 for batch in batches))
+        pd.testing.assert_frame_equal(pd.concat(batches, ignore_index=True), pd.DataFrame(self.raw_data))
+
+        batches = list(
+            parquet.iter_batches(output_path, columns=["sequence"], filters=[("scan_number", "=", 234)], batch_size=2)
+        )
+        pd.testing.assert_frame_equal(pd.concat(batches, ignore_index=True), pd.DataFrame({"sequence": ["KTSQIFLAK"]}))
+
+    def test_write_partition_generator(self):
+        """Check that datasets can be streamed into a partitioned dataset and are split into row groups."""
+        output_path = self.temp_dir / "partition_generator"
+        df = pd.DataFrame(self.raw_data)
+        parquet.write_partition((df for _ in range(2)), output_path, ["dataset_1", "dataset_2"], row_group_size=2)
+        for name in ["dataset_1", "dataset_2"]:
+            pd.testing.assert_frame_equal(parquet.read_partition(output_path, name), df)
+        self.assertEqual(pq.ParquetFile(output_path / "dataset=dataset_1" / "part-0.parquet").num_row_groups, 2)
+
+    def test_partition_writer_append(self):
+        """Check that chunks written under the same dataset name are appended to the same partition."""
+        output_path = self.temp_dir / "partition_writer"
+        df = pd.DataFrame(self.raw_data)
+        with parquet.PartitionWriter(output_path) as writer:
+            writer.write(df.iloc[:2], "dataset_1")
+            writer.write(df.iloc[2:], "dataset_1")
+        pd.testing.assert_frame_equal(parquet.read_partition(output_path, "dataset_1"), df)
+
+    def test_read_partition_missing(self):
+        """Check that reading a dataset that is not part of the partitioned dataset raises an error."""
+        output_path = self.temp_dir / "partition_missing"
+        parquet.write_partition([pd.DataFrame(self.raw_data)], output_path, ["1"])
+        with self.assertRaises(FileNotFoundError):
+            parquet.read_partition(output_path, "2")
+
+    def test_read_partitions(self):
+        """Check that several partitions are read with a string-typed dataset key, even for strings of ints."""
+        output_path = self.temp_dir / "partitions"
+        df = pd.DataFrame(self.raw_data)
+        parquet.write_partition([df, df, df], output_path, ["1", "2", "10"])
+        read_df = parquet.read_partitions(output_path, ["2", "10"], columns=["scan_number"])
+        self.assertEqual(sorted(read_df["dataset"].astype(str).unique()), ["10", "2"])
+        self.assertEqual(len(read_df), 2 * len(df))
+        self.assertEqual(list(read_df.columns), ["scan_number", "dataset"])
+
+    def test_read_write_spectra(self):
+        """Check that spectra given as flat buffers are unmodified after being written and read again."""
+        output_path = self.temp_dir / "spectra.parquet"
+        metadata = pd.DataFrame({"SCAN_NUMBER": [1, 2, 3], "RAW_FILE": ["a", "a", "b"]})
+        mzs = np.array([100.1, 200.2, 300.3, 150.5, 250.5, 400.0])
+        intensities = np.array([1.0, 0.5, 0.25, 1.0, 0.1, 1.0], dtype=np.float32)
+        offsets = np.array([0, 3, 5, 6])
+        parquet.write_spectra(metadata, mzs, intensities, offsets, output_path)
+
+        read_metadata, read_mzs, read_intensities, read_offsets = parquet.read_spectra(output_path)
+        pd.testing.assert_frame_equal(read_metadata, metadata)
+        np.testing.assert_array_equal(read_mzs, mzs)
+        np.testing.assert_array_equal(read_intensities, intensities)
+        np.testing.assert_array_equal(read_offsets, offsets)
+
+        read_metadata, read_mzs, _, read_offsets = parquet.read_spectra(
+            output_path, columns=["SCAN_NUMBER"], filters=[("SCAN_NUMBER", ">", 1)]
+        )
+        pd.testing.assert_frame_equal(read_metadata, pd.DataFrame({"SCAN_NUMBER": [2, 3]}))
+        np.testing.assert_array_equal(read_mzs, mzs[3:])
+        np.testing.assert_array_equal(read_offsets, [0, 2, 3])
+
+        pd.testing.assert_series_equal(
+            pd.read_parquet(output_path)["MZ"].apply(list),
+            pd.Series([list(mzs[:3]), list(mzs[3:5]), list(mzs[5:])], name="MZ"),
+        )
+
+    def test_write_spectra_invalid_offsets(self):
+        """Check that inconsistent offsets are rejected."""
+        with self.assertRaises(ValueError):
+            parquet.write_spectra(
+                pd.DataFrame({"SCAN_NUMBER": [1]}), np.ones(2), np.ones(2), np.array([0, 1, 2]), self.temp_dir / "x"
+            )
@@ -1,9 +1,14 @@
+import os
+import shutil
+import tempfile
 import unittest
 from pathlib import Path
+from unittest.mock import patch
 
 import pandas as pd
 
-from spectrum_io.search_result import Sage
+from spectrum_io.file.table import open_table
+from spectrum_io.search_result import Sage, search_results
 
 COLUMNS = [
     "RAW_FILE",
@@ -50,3 +55,70 @@ class TestSage(unittest.TestCase):
         )
         expected_df = pd.read_csv(expected_sage_internal_path)
         pd.testing.assert_frame_equal(internal_search_results_df, expected_df)
+
+    def test_generate_internal_binary_cache(self):
+        """Test that search results cached in a binary format are read back with unmodified dtypes."""
+        sage = Sage(Path(__file__).parent / "data" / "sage_output.tsv")
+        expected_df = sage.read_result(tmt_label="tmt").reset_index(drop=True)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for suffix in [".parquet", ".feather", ".ipc"]:
+                out_path = Path(temp_dir) / f"internal{suffix}"
+                generated_df = sage.generate_internal(tmt_label="tmt", out_path=out_path)
+                self.assertTrue(out_path.is_file())
+                pd.testing.assert_frame_equal(open_table(out_path).read(), expected_df)
+                cached_df = sage.generate_internal(tmt_label="tmt", out_path=out_path)
+                pd.testing.assert_frame_equal(generated_df.reset_index(drop=True), expected_df)
+                pd.testing.assert_frame_equal(cached_df, expected_df)
+
+    def test_internal_table_missing_values(self):
+        """Test that missing proteins remain missing after a round trip through an internal csv table."""
+        df = Sage(Path(__file__).parent / "data" / "sage_output.tsv").read_result().reset_index(drop=True)
+        df.loc[0, "PROTEINS"] = None
+        with tempfile.TemporaryDirectory() as temp_dir:
+            out_path = Path(temp_dir) / "msms.prosit"
+            search_results.write_internal_table(df, out_path)
+            read_df = search_results.read_internal_table(out_path)
+        self.assertTrue(pd.isna(read_df.loc[0, "PROTEINS"]))
+        self.assertEqual(read_df["PROTEINS"].iloc[1:].tolist(), df["PROTEINS"].iloc[1:].tolist())
+
+    def test_generate_internal_cache_invalidation(self):
+        """Test that cached search results are only reused if search results and parameters did not change."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_path = Path(temp_dir) / "sage_output.tsv"
+            shutil.copy(Path(__file__).parent / "data" / "sage_output.tsv", input_path)
+            out_path = Path(temp_dir) / "internal.parquet"
+            sage = Sage(input_path)
+            full_df = sage.generate_internal(tmt_label="tmt", out_path=out_path)
+
+            # mark the cache to see whether it is reused
+            pd.read_parquet(out_path).head(1).to_parquet(out_path)
+            self.assertEqual(len(sage.generate_internal(tmt_label="tmt", out_path=out_path)), 1)
+
+            # touching the input without changing its content keeps the cache valid
+            os.utime(input_path, ns=(0, 0))
+            self.assertEqual(len(sage.generate_internal(tmt_label="tmt", out_path=out_path)), 1)
+
+            # changed parameters trigger a new conversion
+            self.assertEqual(len(sage.generate_internal(tmt_label="", out_path=out_path)), len(full_df))
+
+            # changed search results trigger a new conversion
+            pd.read_parquet(out_path).head(1).to_parquet(out_path)
+            lines = input_path.read_text().splitlines(keepends=True)
+            input_path.write_text("".join(lines[:-1]))
+            self.assertEqual(len(sage.generate_internal(tmt_label="", out_path=out_path)), len(full_df) - 1)
+
+            # edits keeping the size are detected anywhere in the file, not only in the first and last blocks
+            with patch.object(search_results, "_HASH_BLOCK_SIZE", 16):
+                sage.generate_internal(tmt_label="", out_path=out_path)
+                pd.read_parquet(out_path).head(1).to_parquet(out_path)
+                content = input_path.read_text()
+                middle = len(content) // 2
+                input_path.write_text(
+                    content[:middle] + ("0" if content[middle] != "0" else "1") + content[middle + 1 :]
+                )
+                self.assertEqual(len(sage.generate_internal(tmt_label="", out_path=out_path)), len(full_df) - 1)
+
+            # a cache without fingerprint cannot be verified and is converted again
+            pd.read_parquet(out_path).head(1).to_parquet(out_path)
+            Path(str(out_path) + search_results.FINGERPRINT_SUFFIX).unlink()
+            self.assertEqual(len(sage.generate_internal(tmt_label="", out_path=out_path)), len(full_df) - 1)
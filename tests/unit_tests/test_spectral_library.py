@@ -1,11 +1,13 @@
 import sqlite3
+from multiprocessing import Manager
+from multiprocessing.shared_memory import SharedMemory
 from pathlib import Path
 
 import numpy as np
 import pandas as pd
 import pytest
 
-from spectrum_io.spectral_library import MSP, DLib, Spectronaut
+from spectrum_io.spectral_library import MSP, DLib, SharedBatch, Spectronaut
 
 
 class TestMSP:
@@ -128,6 +130,38 @@ class TestDLib:
         out_file.unlink()
 
 
+class TestSharedBatch:
+    """Class to test the shared memory transport of batches."""
+
+    def test_attach(self, data, metadata):
+        """Test that arrays are unmodified after passing through shared memory and the block is released."""
+        batch = SharedBatch.from_arrays(data, metadata)
+        with batch.attach() as (shared_data, shared_metadata):
+            for key, array in data.items():
+                np.testing.assert_array_equal(shared_data[key], array)
+                assert shared_data[key].dtype == array.dtype
+            pd.testing.assert_frame_equal(shared_metadata, metadata)
+        with pytest.raises(FileNotFoundError):
+            SharedMemory(name=batch.name)
+
+    def test_async_write(self, data, metadata):
+        """Test that async_write produces the same library from shared batches as from pickled batches."""
+        out_files = [Path(__file__).parent / "test_shared.msp", Path(__file__).parent / "test_pickled.msp"]
+        with Manager() as manager:
+            for out_file, content in zip(
+                out_files, [SharedBatch.from_arrays(data, metadata), (data, metadata)], strict=True
+            ):
+                queue = manager.Queue()
+                progress = manager.Value("i", 0)
+                queue.put(content)
+                queue.put(None)
+                MSP(out_file).async_write(queue, progress)
+                assert progress.value == 1
+        assert out_files[0].read_text() == out_files[1].read_text()
+        for out_file in out_files:
+            out_file.unlink()
+
+
 @pytest.fixture
 def data():
     """Creates data dictionary."""
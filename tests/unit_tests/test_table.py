@@ -0,0 +1,104 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+import pandas as pd
+
+from spectrum_io.file import csv, open_table
+
+try:
+    import tables  # noqa: F401
+
+    HAS_PYTABLES = True
+except ImportError:
+    HAS_PYTABLES = False
+
+
+class TestTable(unittest.TestCase):
+    """Test class to check the unified table file interface."""
+
+    @classmethod
+    def setUpClass(cls):  # noqa: D102
+        cls.df = pd.DataFrame(
+            {
+                "RAW_FILE": ["run_1", "run_1", "run_2", "run_2", "run_3"],
+                "SCAN_NUMBER": [1, 234, 5678, 9000, 12],
+                "SCORE": [12.5, 3.25, 100.0, 0.5, 7.0],
+            }
+        )
+        cls.temp_dir = Path(tempfile.mkdtemp())
+        cls.suffixes = [".csv", ".parquet", ".feather"]
+        if HAS_PYTABLES:
+            cls.suffixes.append(".hdf5")
+
+    @classmethod
+    def tearDownClass(cls):  # noqa: D102
+        shutil.rmtree(cls.temp_dir)
+
+    def test_write_read(self):
+        """Check that batches written to a table are read back unmodified, completely or in batches."""
+        for suffix in self.suffixes:
+            with self.subTest(suffix=suffix):
+                path = self.temp_dir / f"write_read{suffix}"
+                with open_table(path, "w") as table:
+                    table.write(self.df.iloc[:2])
+                    table.write(self.df.iloc[2:])
+                table = open_table(path)
+                pd.testing.assert_frame_equal(table.read().reset_index(drop=True), self.df)
+                pd.testing.assert_frame_equal(
+                    table.read(columns=["SCAN_NUMBER"]).reset_index(drop=True), self.df[["SCAN_NUMBER"]]
+                )
+                batches = list(table.iter_batches(batch_size=2, columns=["RAW_FILE", "SCORE"]))
+                self.assertTrue(all(len(batch) <= 2 for batch in batches))
+                pd.testing.assert_frame_equal(pd.concat(batches).reset_index(drop=True), self.df[["RAW_FILE", "SCORE"]])
+
+    def test_append(self):
+        """Check that appending to an existing table keeps its content."""
+        for suffix in self.suffixes:
+            with self.subTest(suffix=suffix):
+                path = self.temp_dir / f"append{suffix}"
+                with open_table(path, "w") as table:
+                    table.write(self.df.iloc[:3])
+                with open_table(path, "a") as table:
+                    table.write(self.df.iloc[3:])
+                pd.testing.assert_frame_equal(open_table(path).read().reset_index(drop=True), self.df)
+
+    def test_csv_matches_write_file(self):
+        """Check that batches written to a csv table give the same output as writing the frame at once."""
+        df = self.df.assign(REVERSE=[False, True, False, False, True], PROTEINS=[["P1"], ["P2", "P3"], [], ["P4"], []])
+        for engine in csv.ENGINES:
+            with self.subTest(engine=engine):
+                data = df if engine == "c" else df.drop(columns="PROTEINS")
+                expected_path = self.temp_dir / f"expected_{engine}.csv"
+                csv.write_file(data, expected_path, engine=engine)
+                path = self.temp_dir / f"batches_{engine}.csv"
+                with open_table(path, "w", engine=engine) as table:
+                    table.write(data.iloc[:2])
+                with open_table(path, "a", engine=engine) as table:
+                    table.write(data.iloc[2:])
+                self.assertEqual(path.read_bytes(), expected_path.read_bytes())
+
+    def test_overwrite_without_write(self):
+        """Check that opening an existing table for writing discards it, even if nothing is written."""
+        for suffix in self.suffixes:
+            with self.subTest(suffix=suffix):
+                path = self.temp_dir / f"overwrite{suffix}"
+                with open_table(path, "w") as table:
+                    table.write(self.df)
+                with open_table(path, "w"):
+                    pass
+                # an empty csv file, a missing file or hdf5 key
+                with self.assertRaises((ValueError, OSError, KeyError)):
+                    open_table(path).read()
+
+    def test_invalid_usage(self):
+        """Check that unknown suffixes, modes and writes to tables opened for reading are rejected."""
+        with self.assertRaises(ValueError):
+            open_table(self.temp_dir / "table.xyz")
+        with self.assertRaises(ValueError):
+            open_table(self.temp_dir / "table.csv", "x")
+        with self.assertRaises(ValueError):
+            open_table(self.temp_dir / "table.csv").write(self.df)
+        with self.assertRaises(ValueError):
+            open_table(self.temp_dir / "table.csv", "w", engine="python")
@@ -1,9 +1,11 @@
 import unittest
 from pathlib import Path
+from unittest.mock import patch
 
 import pandas as pd
 
-from spectrum_io.search_result import Xisearch
+from spectrum_io import config
+from spectrum_io.search_result import Xisearch, xisearch
 
 
 class TestXisearch(unittest.TestCase):
@@ -31,3 +33,38 @@ class TestXisearch(unittest.TestCase):
 
         expected_df = pd.read_csv(expected_xisearch_internal_path, sep="\t", converters=converters)
         pd.testing.assert_frame_equal(internal_search_results_df, expected_df)
+
+    def test_self_or_between_mp(self):
+        """Test classifying crosslinks as self or between links using the shared worker pool."""
+        df = pd.DataFrame(
+            {
+                "protein_p1": ["P1", "REV_P1;P2", "P3", "P4"],
+                "protein_p2": ["P1", "P2", "P4", "REV_P4"],
+            }
+        )
+        pd.testing.assert_series_equal(
+            Xisearch._self_or_between_mp(df),
+            pd.Series(["self", "self", "between", "self"], name="is_between"),
+        )
+
+    def test_self_or_between_mp_slices(self):
+        """Test that at most 10 slices are in flight, each fitting into the max_batch_bytes of the configuration."""
+        df = pd.DataFrame({"protein_p1": ["P1"] * 100, "protein_p2": ["P2"] * 100})
+        slices = []
+
+        def parallel_map(fn, df_slices, max_in_flight):
+            self.assertEqual(max_in_flight, 10)
+            for df_slice in df_slices:
+                slices.append(df_slice)
+                yield fn(df_slice)
+
+        with (
+            patch.object(xisearch, "get_max_workers", return_value=128),
+            patch.object(xisearch, "parallel_map", side_effect=parallel_map),
+        ):
+            self.assertEqual(Xisearch._self_or_between_mp(df).tolist(), ["between"] * 100)
+            self.assertEqual(len(slices), 10)
+            slices.clear()
+            with config.config_context(max_batch_bytes=int(df.memory_usage(deep=True, index=False).sum() // 10)):
+                self.assertEqual(Xisearch._self_or_between_mp(df).tolist(), ["between"] * 100)
+            self.assertEqual(len(slices), 100)